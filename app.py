@@ -1,33 +1,46 @@
+import hashlib
+import json
 import os
+from dataclasses import replace
+
 import pandas as pd
 import streamlit as st
 
 from src.config import Settings
-from src.io_utils import load_resume_file, safe_filename, ensure_dir
-from src.ranker import rank_candidates
-from src.explain import generate_explanation
+from src.io_utils import safe_filename, ensure_dir
+from src.ranker import RankingSession, jd_profile, session_key
+from src.explain import stream_explanation
 from src.agentic.orchestrator import AgentOrchestrator
+from src.agentic.agents import resume_parsing_agent
+from src.evidence import LineIndex
+from src.text_utils import normalize
+from src.openai_utils import configure_openai
 
 st.set_page_config(page_title="AI Resume Ranker", layout="wide")
 settings = Settings()
+configure_openai(settings)
 
 # Session state defaults
 if "has_results" not in st.session_state:
     st.session_state.has_results = False
-if "results" not in st.session_state:
-    st.session_state.results = []
-if "df" not in st.session_state:
-    st.session_state.df = None
+if "ranking" not in st.session_state:
+    st.session_state.ranking = None  # ranker.Ranking: candidate store + component scores (re-weighting)
+if "rank_session" not in st.session_state:
+    st.session_state.rank_session = None  # ranker.RankingSession for the current JD + settings
 if "jd_text" not in st.session_state:
     st.session_state.jd_text = ""
 if "raw_text_map" not in st.session_state:
     st.session_state.raw_text_map = {}
+if "line_indexes" not in st.session_state:
+    st.session_state.line_indexes = {}  # key: filename -> evidence LineIndex, built on first drill-down
 if "explanations" not in st.session_state:
     st.session_state.explanations = {}  # key: candidate_id -> explanation text
 if "jd_skills" not in st.session_state:
     st.session_state.jd_skills = []
 if "agent_logs" not in st.session_state:
     st.session_state.agent_logs = []
+if "agent_metrics" not in st.session_state:
+    st.session_state.agent_metrics = {}
 
 st.title("AI Resume Screening & Candidate Ranking")
 st.caption("Upload resumes + paste a job description → get ranked, explainable results with bias checks.")
@@ -45,18 +58,22 @@ with st.sidebar:
     )
 
     st.header("3) Settings")
-    st.write("Scoring weights (edit in src/config.py):")
-    st.write(f"- Embedding similarity: {settings.w_embed}")
-    st.write(f"- Skill overlap: {settings.w_skill}")
-    st.write(f"- Experience heuristic: {settings.w_exp}")
-    st.write(f"Bias flag threshold (delta): {settings.bias_delta_flag}")
+    st.write("Scoring weights (changes re-rank instantly, no re-run needed):")
+    settings = replace(
+        settings,
+        w_embed=st.slider("Embedding similarity", 0.0, 1.0, settings.w_embed, 0.05),
+        w_skill=st.slider("Skill overlap", 0.0, 1.0, settings.w_skill, 0.05),
+        w_exp=st.slider("Experience heuristic", 0.0, 1.0, settings.w_exp, 0.05),
+        bias_delta_flag=st.slider("Bias flag threshold (delta)", 0.0, 0.5, settings.bias_delta_flag, 0.01),
+    )
 
     col1, col2 = st.columns(2)
     run_btn = col1.button("Run Ranking", type="primary", use_container_width=True)
     reset_btn = col2.button("Reset", use_container_width=True)
 
     st.header("Agentic Orchestration (Beta)")
-    auto_explain = st.checkbox("Auto-generate explanations for top 3", value=False)
+    auto_explain = st.checkbox("Auto-generate explanations for top K", value=False)
+    auto_explain_k = st.number_input("K (explained concurrently)", min_value=1, max_value=50, value=3, step=1)
     agentic_btn = st.button("Run Agentic Pipeline", use_container_width=True)
 # Helpers
 def _save_uploaded_file(uploaded) -> str:
@@ -66,14 +83,23 @@ def _save_uploaded_file(uploaded) -> str:
         f.write(uploaded.getbuffer())
     return path
 
+def _archive_uploads(uploaded_files) -> None:
+    """
+    Opt-in (Settings.archive_uploads): parsing itself reads the upload buffers in memory.
+    """
+    if settings.archive_uploads:
+        for f in uploaded_files:
+            _save_uploaded_file(f)
+
 
 # Reset logic
 if reset_btn:
     st.session_state.has_results = False
-    st.session_state.results = []
-    st.session_state.df = None
+    st.session_state.ranking = None
+    st.session_state.rank_session = None
     st.session_state.jd_text = ""
     st.session_state.raw_text_map = {}
+    st.session_state.line_indexes = {}
     st.session_state.explanations = {}
     st.rerun()
 
@@ -88,45 +114,55 @@ if run_btn:
 
     st.session_state.jd_text = jd_text
 
-    from src.text_utils import extract_sections, tokenize_skills, extract_jd_relevant_block
+    profile = jd_profile(jd_text, settings)
+    st.session_state.jd_skills = profile.skills
 
-    jd_text_n = jd_text.strip()
-    jd_sections = extract_sections(jd_text_n)
-    jd_block = jd_sections.get("skills", "") or extract_jd_relevant_block(jd_text_n)
-    st.session_state.jd_skills = tokenize_skills(jd_block)
+    # Same JD + settings as the last run: only new / changed / removed files are processed
+    session = st.session_state.rank_session
+    if session is None or session.key != session_key(profile, settings):
+        session = RankingSession(profile, settings)
+        st.session_state.rank_session = session
+        st.session_state.raw_text_map = {}
+        st.session_state.line_indexes = {}
+        st.session_state.explanations = {}  # reset explanations for new run
+    session.reweight(settings)
 
+    raw_text_map = st.session_state.raw_text_map
+    line_indexes = st.session_state.line_indexes
+    fingerprints = {f.name: hashlib.sha256(f.getbuffer()).hexdigest() for f in files}
+    changed = [f for f in files if session.fingerprint(f.name) != fingerprints[f.name]]
 
     resume_items = []
-    raw_text_map = {}
-
-    with st.spinner("Reading resumes..."):
-        for f in files:
-            path = _save_uploaded_file(f)
-            text = load_resume_file(path)
-            resume_items.append((f.name, text))
-            raw_text_map[f.name] = text
-
-    with st.spinner("Scoring + ranking candidates..."):
-        results = rank_candidates(jd_text=jd_text, resumes=resume_items, settings=settings)
-
-    df = pd.DataFrame([{
-        "Candidate": r.candidate_id,
-        "Resume File": r.filename,
-        "Overall Score": r.score,
-        "Embed Similarity": r.score_embed,
-        "Skill Match": r.score_skill,
-        "Exp Score": r.score_exp,
-        "Years Exp (guess)": r.years_exp_guess,
-        "Bias Flagged": r.bias_flagged,
-        "Bias Δ (orig - masked)": r.bias_score_delta,
-        "Sensitive Detected": ", ".join(r.bias_sensitive_found.keys()) if r.bias_sensitive_found else ""
-    } for r in results])
-
-    st.session_state.results = results
-    st.session_state.df = df
+    if changed:
+        with st.spinner(f"Reading {len(changed)} new or changed resumes..."):
+            _archive_uploads(changed)
+            parsed = resume_parsing_agent(changed, settings, names=[f.name for f in changed])
+        for p in parsed:
+            if p.ok:
+                resume_items.append((p.filename, p.text))
+                raw_text_map[p.filename] = p.text
+                line_indexes.pop(p.filename, None)
+            else:
+                st.warning(f"Skipped {p.filename}: {p.error}")
+
+    gone = [name for name in list(raw_text_map) if name not in fingerprints]
+    session.remove(gone)
+    for name in gone:
+        raw_text_map.pop(name, None)
+        line_indexes.pop(name, None)
+
+    if resume_items:
+        with st.spinner(f"Scoring + ranking {len(resume_items)} candidates..."):
+            fresh = session.add(resume_items, fingerprints=[fingerprints[fn] for fn, _ in resume_items])
+        for r in fresh:
+            st.session_state.explanations.pop(r.candidate_id, None)  # content changed under a kept ID
+    if not len(session):
+        st.error("None of the uploaded resumes could be read.")
+        st.stop()
+
+    st.session_state.ranking = session.ranking
     st.session_state.raw_text_map = raw_text_map
     st.session_state.has_results = True
-    st.session_state.explanations = {}  # reset explanations for new run
 
 # Display (uses session_state)
 if st.session_state.has_results:
@@ -135,8 +171,30 @@ if st.session_state.has_results:
         with st.expander("Agent run log", expanded=False):
             for e in st.session_state.agent_logs:
                 st.write("• " + e)
-    results = st.session_state.results
-    df = st.session_state.df
+            run_metrics = st.session_state.agent_metrics
+            if run_metrics:
+                st.write("**Stage timings:**")
+                st.dataframe(
+                    pd.DataFrame([{"Stage": name, **vals} for name, vals in run_metrics["spans"].items()]),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                st.write("**Counters:**")
+                st.json(run_metrics["counters"])
+                st.download_button(
+                    "Download run metrics (JSON)",
+                    data=json.dumps(run_metrics, indent=2).encode("utf-8"),
+                    file_name="agent_run_metrics.json",
+                    mime="application/json",
+                )
+    # Re-score + re-sort from stored component scores (sidebar weights / threshold);
+    # the table and drill-down read the ranking's columnar store directly
+    session = st.session_state.rank_session
+    if session is not None and session.ranking is st.session_state.ranking:
+        results = session.reweight(settings)
+    else:
+        results = st.session_state.ranking.reweight(settings)
+    df = results.to_frame()
 
     st.subheader("Ranked Candidates")
 
@@ -166,8 +224,8 @@ if st.session_state.has_results:
     st.divider()
     st.subheader("Candidate Drill-Down")
 
-    pick = st.selectbox("Select a candidate", options=[r.candidate_id for r in results])
-    chosen = next(r for r in results if r.candidate_id == pick)
+    pick = st.selectbox("Select a candidate", options=results.candidate_ids)
+    chosen = results.by_id(pick)  # CandidateView: fields decoded from the store on access
 
     left, right = st.columns([1, 1])
 
@@ -188,6 +246,21 @@ if st.session_state.has_results:
         else:
             st.info("No direct snippet matches found. (Often caused by resume formatting.)")
 
+        raw_text = st.session_state.raw_text_map.get(chosen.filename, "")
+        if raw_text and chosen.matched_skills:
+            with st.expander("Evidence by skill", expanded=False):
+                index = st.session_state.line_indexes.get(chosen.filename)
+                if index is None:
+                    index = LineIndex(normalize(raw_text))
+                    st.session_state.line_indexes[chosen.filename] = index
+                st.write("**Lines covering the most matched skills:**")
+                for ln in index.ranked_snippets(chosen.matched_skills, max_snips=3):
+                    st.code(ln)
+                for skill, lines in index.by_skill(chosen.matched_skills).items():
+                    st.write(f"**{skill}** ({len(lines)} line{'s' if len(lines) != 1 else ''})")
+                    for ln in lines[:3]:
+                        st.code(ln)
+
     with right:
         st.markdown("### Bias & Transparency")
 
@@ -211,15 +284,15 @@ if st.session_state.has_results:
             st.markdown(st.session_state.explanations[chosen.candidate_id])
 
         if st.button("Generate Explanation"):
-            with st.spinner("Generating explanation..."):
-                explanation = generate_explanation(
-                    jd_text=st.session_state.jd_text,
-                    matched_skills=chosen.matched_skills,
-                    missing_skills=chosen.missing_skills,
-                    evidence_snippets=chosen.evidence_snippets,
-                    bias_sensitive_found=chosen.bias_sensitive_found,
-                    settings=settings
-                )
+            # Stream tokens into the page as they arrive
+            explanation = st.write_stream(stream_explanation(
+                jd_text=st.session_state.jd_text,
+                matched_skills=chosen.matched_skills,
+                missing_skills=chosen.missing_skills,
+                evidence_snippets=chosen.evidence_snippets,
+                bias_sensitive_found=chosen.bias_sensitive_found,
+                settings=settings
+            ))
             st.session_state.explanations[chosen.candidate_id] = explanation
             st.rerun()
 
@@ -233,32 +306,25 @@ if agentic_btn:
 
     st.session_state.jd_text = jd_text
 
-    resume_items = []
-    raw_text_map = {}
-
-    with st.spinner("Reading resumes..."):
-        for f in files:
-            path = _save_uploaded_file(f)
-            text = load_resume_file(path)
-            resume_items.append((f.name, text))
-            raw_text_map[f.name] = text
-
-    st.session_state.raw_text_map = raw_text_map
-
     with st.spinner("Running agentic pipeline..."):
-        orch = AgentOrchestrator(Settings())
+        _archive_uploads(files)
+        orch = AgentOrchestrator(settings)
         state = orch.run(
             jd_text=jd_text,
-            resumes=resume_items,
-            auto_explain_top_k=3 if auto_explain else 0,
+            resume_files=[(f.name, f) for f in files],
+            auto_explain_top_k=int(auto_explain_k) if auto_explain else 0,
         )
 
+    st.session_state.raw_text_map = state.resumes
+
     # store outputs like your normal run
     st.session_state.has_results = True
-    st.session_state.df = state.ranked_df
+    st.session_state.ranking = state.ranking
+    st.session_state.rank_session = None  # the agentic run replaced the pool
     st.session_state.jd_skills = state.jd_skills
     st.session_state.explanations = state.explanations
     st.session_state.agent_logs = state.events
+    st.session_state.agent_metrics = state.metrics
 
     st.rerun()
 
@@ -0,0 +1,195 @@
+"""
+End-to-end pipeline benchmark on a synthetic corpus against a fake OpenAI server.
+
+    python -m benchmarks.bench_pipeline [--sizes 10,100,1000] [--latency-ms 50]
+        [--out bench_results.json] [--workdir .bench] [--trace-memory]
+
+For each pool size it writes TXT / DOCX / PDF resumes (benchmarks/corpus.py),
+starts benchmarks/fake_openai.py with the given per-request latency, and
+times load_resume_file, scan_and_mask_sensitive, tokenize_skills (per
+resume) plus rank_candidates and AgentOrchestrator.run (per pool). Every
+run of a per-pool stage (including each --repeat) gets its own empty cache
+directory and starts with no cached JD profile, so every run is cold.
+
+Per stage it reports calls, items, total seconds, p50 / p90 / p99 / max
+latency, throughput (items/s) and process_peak_rss_mb, the process RSS
+high-water mark so far. That one is cumulative (ru_maxrss never goes down), so
+it only says something about a stage when it grows during it. For memory per
+stage use --trace-memory, which adds the tracemalloc peak of each stage on its
+own (stage_peak_traced_mb; slower, so timings are inflated). Results go to a
+JSON file so runs can be diffed.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.agentic.orchestrator import AgentOrchestrator
+from src.bias_utils import scan_and_mask_sensitive
+from src.config import Settings
+from src.io_utils import load_resume_file
+from src.openai_utils import configure_openai
+from src import ranker
+from src.ranker import rank_candidates
+from src.text_utils import tokenize_skills
+
+from .corpus import build_corpus
+from .fake_openai import FakeOpenAI, fake_counts_delta, reset_openai_clients
+
+def _process_peak_rss_mb() -> float:
+    # high-water mark of the whole process since it started, not of one stage
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+def _summary(latencies: List[float], items: int, total_s: float) -> Dict[str, Any]:
+    lat = np.asarray(latencies) * 1e3
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "total_s": round(total_s, 4),
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p90_ms": round(float(np.percentile(lat, 90)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "max_ms": round(float(lat.max()), 3),
+        "throughput_per_s": round(items / total_s, 2) if total_s > 0 else None,
+    }
+
+def run_stage(fn: Callable[[Any], Any], inputs: List[Any], items_per_call: int, trace_memory: bool) -> Dict[str, Any]:
+    """
+    Call fn on every input, timing each call.
+    """
+    if trace_memory:
+        tracemalloc.start()
+    latencies = []
+    start = time.perf_counter()
+    for x in inputs:
+        t0 = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    out = _summary(latencies, items_per_call * len(inputs), total)
+    if trace_memory:
+        out["stage_peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        tracemalloc.stop()
+    out["process_peak_rss_mb"] = round(_process_peak_rss_mb(), 1)
+    return out
+
+def _cold(settings: Settings, cache_dir: str) -> Settings:
+    """
+    `settings` pointed at an emptied cache directory.
+    """
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return replace(settings, cache_dir=cache_dir)
+
+def _forget_jds() -> None:
+    # jd_profile keeps the JD (and its embedding, once used) across calls
+    ranker._JD_PROFILES.clear()
+
+def bench_size(n: int, args: argparse.Namespace, server: FakeOpenAI) -> Dict[str, Any]:
+    paths, jds = build_corpus(os.path.join(args.workdir, "corpus"), n)
+    cache_dir = os.path.join(args.workdir, f"cache_{n}")
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    settings = replace(Settings(), cache_dir=cache_dir, embedding_model=args.embedding_model)
+    configure_openai(settings)
+    jd = jds[0]
+
+    stages: Dict[str, Any] = {}
+    texts: List[str] = []
+
+    def load(path: str) -> None:
+        texts.append(load_resume_file(path))
+
+    def counted(name: str, fn: Callable[[Any], Any], inputs: List[Any], items_per_call: int) -> None:
+        before = server.stats()
+        stages[name] = run_stage(fn, inputs, items_per_call, args.trace_memory)
+        stages[name].update(fake_counts_delta(before, server.stats()))
+
+    counted("load_resume_file", load, paths, 1)
+    stages["load_resume_file"]["bytes_parsed"] = sum(os.path.getsize(p) for p in paths)
+    counted("scan_and_mask_sensitive", scan_and_mask_sensitive, texts, 1)
+    counted("tokenize_skills", tokenize_skills, texts, 1)
+
+    items = [(os.path.basename(p), t) for p, t in zip(paths, texts)]
+
+    def rank(run_settings: Settings) -> None:
+        _forget_jds()
+        rank_candidates(jd, items, run_settings)
+
+    rank_runs = [_cold(settings, f"{cache_dir}_rank{i}") for i in range(args.repeat)]
+    counted("rank_candidates", rank, rank_runs, n)
+
+    # Separate fresh caches so the orchestrator does its own parsing + embedding
+    files = [(os.path.basename(p), p) for p in paths]
+
+    def run_agents(orch: AgentOrchestrator) -> None:
+        _forget_jds()
+        orch.run(jd_text=jd, resume_files=files, auto_explain_top_k=args.explain_top_k)
+
+    orchs = [AgentOrchestrator(_cold(settings, f"{cache_dir}_agent{i}")) for i in range(args.repeat)]
+    counted("AgentOrchestrator.run", run_agents, orchs, n)
+    return {"size": n, "stages": stages}
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Pipeline benchmark against a fake OpenAI server.")
+    ap.add_argument("--sizes", default="10,100,1000", help="comma-separated pool sizes (10 .. 50000)")
+    ap.add_argument("--latency-ms", type=float, default=50.0, help="fake server latency per request")
+    ap.add_argument("--dim", type=int, default=1536, help="fake embedding dimension")
+    ap.add_argument("--embedding-model", default=Settings().embedding_model)
+    ap.add_argument("--explain-top-k", type=int, default=3)
+    ap.add_argument("--repeat", type=int, default=1, help="runs of the per-pool stages")
+    ap.add_argument("--workdir", default=".bench")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--trace-memory", action="store_true", help="per-stage tracemalloc peak (slower)")
+    args = ap.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    runs = []
+    with FakeOpenAI(latency_s=args.latency_ms / 1e3, dim=args.dim) as server:
+        reset_openai_clients()
+        for n in sizes:
+            print(f"size {n}...", flush=True)
+            runs.append(bench_size(n, args, server))
+            for name, st in runs[-1]["stages"].items():
+                mem = (
+                    f"stage peak {st['stage_peak_traced_mb']:>8.1f} MB"
+                    if "stage_peak_traced_mb" in st
+                    else f"process rss hwm {st['process_peak_rss_mb']:>8.1f} MB"
+                )
+                print(
+                    f"  {name:26} p50 {st['p50_ms']:>10.2f} ms  p99 {st['p99_ms']:>10.2f} ms  "
+                    f"{st['throughput_per_s'] or 0:>10.1f} items/s  {mem}"
+                )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "runs": runs,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: per-resume preprocessing via plain strings vs ResumeDocument.
+
+    python -m benchmarks.bench_resume_document [n_resumes]
+
+Runs the non-embedding part of the ranking pipeline (normalize, bias scan,
+sections, skills, years of experience, evidence snippets) over synthetic
+resumes both ways, checks the outputs agree, and prints normalize() calls,
+peak traced allocations and wall time for each.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+import src.text_utils as text_utils
+from src.bias_utils import scan_and_mask_sensitive
+from src.evidence import LineIndex
+from src.ranker import _skill_score
+from src.text_utils import ResumeDocument, extract_sections, find_years_experience, tokenize_skills
+
+from .bench_tokenize_skills import synthetic_resume
+
+JD_SKILLS = ["sql", "python", "tableau", "a/b testing", "snowflake", "etl", "nlp", "jira"]
+
+def string_pipeline(text: str) -> Tuple:
+    """
+    What the ranker did per resume before ResumeDocument.
+    """
+    text_n = text_utils.normalize(text)
+    scan = scan_and_mask_sensitive(text_n)
+    sections = extract_sections(text_n)
+    skills = tokenize_skills(sections.get("skills", "") or text_n)
+    s_skill, matched, missing = _skill_score(JD_SKILLS, skills)
+    years = find_years_experience(text_n)
+    snippets = LineIndex(text_utils.normalize(text_n)).snippets(matched)
+    return s_skill, matched, missing, years, scan.found, snippets
+
+def document_pipeline(text: str) -> Tuple:
+    doc = ResumeDocument(text)
+    scan = scan_and_mask_sensitive(doc)
+    s_skill, matched, missing = _skill_score(JD_SKILLS, doc)
+    years = find_years_experience(doc)
+    snippets = doc.line_index.snippets(matched)
+    return s_skill, matched, missing, years, scan.found, snippets
+
+def _run(fn: Callable[[str], Tuple], texts: List[str]) -> Tuple[List[Tuple], int, float, float]:
+    """
+    Outputs, normalize() calls, mean per-resume allocation peak (bytes) and
+    wall time. Timing is a separate pass without tracemalloc.
+    """
+    calls = 0
+    original = text_utils.normalize
+
+    def counting_normalize(text: str) -> str:
+        nonlocal calls
+        calls += 1
+        return original(text)
+
+    text_utils.normalize = counting_normalize
+    try:
+        start = time.perf_counter()
+        out = [fn(t) for t in texts]
+        elapsed = time.perf_counter() - start
+    finally:
+        text_utils.normalize = original
+
+    peaks = 0
+    tracemalloc.start()
+    for t in texts:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(t)
+        peaks += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return out, calls, peaks / max(1, len(texts)), elapsed
+
+def main(n: int = 10_000) -> None:
+    rng = random.Random(0)
+    texts = []
+    for i in range(n):
+        body = synthetic_resume(rng)
+        if i % 3 == 0:
+            body = "SKILLS\n" + body + "\nEXPERIENCE\n" + f"{rng.randint(1, 12)} years at Acme. Age: 34"
+        texts.append(body)
+
+    legacy, legacy_calls, legacy_peak, legacy_s = _run(string_pipeline, texts)
+    current, current_calls, current_peak, current_s = _run(document_pipeline, texts)
+    mismatches = sum(1 for a, b in zip(legacy, current) if a != b)
+
+    print(f"resumes: {n}, output mismatches: {mismatches}")
+    print(f"{'':16}{'normalize()':>12}{'peak KB/resume':>16}{'seconds':>10}")
+    print(f"{'strings':16}{legacy_calls:>12}{legacy_peak / 1e3:>16.1f}{legacy_s:>10.2f}")
+    print(f"{'ResumeDocument':16}{current_calls:>12}{current_peak / 1e3:>16.1f}{current_s:>10.2f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
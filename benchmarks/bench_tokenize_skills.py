@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: tokenize_skills vs the original per-pattern implementation.
+
+    python -m benchmarks.bench_tokenize_skills [n_resumes]
+
+Checks that both return the same skill list for every synthetic resume, then
+prints per-resume timings.
+"""
+import random
+import re
+import sys
+import time
+from typing import List
+
+from src.text_utils import COMMON_SKILLS, FILLER_PATTERNS, normalize, tokenize_skills
+
+WORDS = (
+    "built data pipelines with python and sql for product analytics team using tableau looker "
+    "aws snowflake etl mysql postgresql strong communication fast-paced detail-oriented "
+    "stakeholder management a/b testing ab testing experimentation cohort analysis machine "
+    "learning nlp responsible for excellent self-starter about company power bi excel"
+).split()
+
+def _legacy_clean_token(token: str) -> str:
+    token = token.strip()
+    token = re.sub(r"^[\-\*\u2022•\d\.\)\( ]+", "", token)
+    token = re.sub(r"\s+", " ", token)
+    return token.strip()
+
+def legacy_tokenize_skills(text: str) -> List[str]:
+    """
+    Frozen copy of the pre-compilation tokenize_skills, for comparison only.
+    """
+    t = normalize(text).lower()
+    lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
+    candidates: List[str] = []
+    for ln in lines:
+        parts = re.split(r"[,\|;/]+", ln)
+        for p in parts:
+            p = _legacy_clean_token(p)
+            if not p:
+                continue
+            if len(p) > 60:
+                continue
+            candidates.append(p)
+    for sk in COMMON_SKILLS:
+        if sk in t:
+            candidates.append(sk)
+    filtered = []
+    for c in candidates:
+        if any(re.search(fp, c) for fp in FILLER_PATTERNS):
+            if not any(h in c for h in ["sql", "python", "excel", "tableau", "power bi", "looker"]):
+                continue
+        if 1 < len(c) <= 40:
+            filtered.append(c)
+    seen = set()
+    out = []
+    for c in filtered:
+        c2 = c.strip().lower()
+        c2 = c2.replace("ab testing", "a/b testing")
+        if c2 not in seen:
+            seen.add(c2)
+            out.append(c2)
+    return out
+
+def synthetic_resume(rng: random.Random) -> str:
+    lines = []
+    for _ in range(rng.randint(30, 120)):
+        head = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 14)))
+        tail = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4)))
+        lines.append(rng.choice(["- ", "• ", "1. ", ""]) + head + rng.choice([", ", "; ", " | ", " / ", " "]) + tail)
+    return "\n".join(lines)
+
+def _time_per_call(fn, texts: List[str], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for t in texts:
+            fn(t)
+        best = min(best, (time.perf_counter() - start) / len(texts))
+    return best
+
+def main(n: int = 500) -> None:
+    rng = random.Random(0)
+    texts = [synthetic_resume(rng) for _ in range(n)]
+
+    mismatches = sum(1 for t in texts if tokenize_skills(t) != legacy_tokenize_skills(t))
+    legacy = _time_per_call(legacy_tokenize_skills, texts)
+    current = _time_per_call(tokenize_skills, texts)
+
+    print(f"resumes: {n}, output mismatches: {mismatches}")
+    print(f"legacy tokenize_skills:  {legacy * 1e3:.3f} ms/resume")
+    print(f"current tokenize_skills: {current * 1e3:.3f} ms/resume  ({legacy / current:.2f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
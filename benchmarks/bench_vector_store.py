@@ -0,0 +1,74 @@
+"""
+Accuracy / size report for the quantized vector store (src/vector_store.py).
+
+    python -m benchmarks.bench_vector_store [n_vectors] [dim] [--out report.json]
+
+Builds clustered synthetic embeddings (resumes drawn around a few hundred
+"profiles", queries near random profiles, like JDs against a pool), stores
+them as int8 and float16, and reports recall@10, cosine error, bytes per
+vector and scan time against full-precision float64 vectors.
+"""
+import argparse
+import json
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.vector_store import QuantizedVectorStore, quantization_report
+
+def synthetic_embeddings(n: int, dim: int, n_queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(8, n // 50), dim))
+    vecs = centers[rng.integers(0, len(centers), n)] + 0.6 * rng.standard_normal((n, dim))
+    queries = centers[rng.integers(0, len(centers), n_queries)] + 0.8 * rng.standard_normal((n_queries, dim))
+    return vecs, queries
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Quantized vector store accuracy report.")
+    ap.add_argument("n", nargs="?", type=int, default=20_000)
+    ap.add_argument("dim", nargs="?", type=int, default=1536)
+    ap.add_argument("--queries", type=int, default=50)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--out", default="")
+    args = ap.parse_args(argv)
+
+    vecs, queries = synthetic_embeddings(args.n, args.dim, args.queries)
+    ids = [f"r{i}" for i in range(args.n)]
+
+    start = time.perf_counter()
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    _ = queries @ unit.T
+    full_scan_s = time.perf_counter() - start
+
+    reports: List[Dict[str, Any]] = []
+    for dtype in ("float16", "int8"):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = QuantizedVectorStore(tmp, dim=args.dim, dtype=dtype)
+            store.add(ids, vecs)
+            store.flush()
+            start = time.perf_counter()
+            store.similarities(queries)
+            scan_s = time.perf_counter() - start
+            report = quantization_report(vecs, store, ids, queries, k=args.k)
+            report["scan_s"] = round(scan_s, 4)
+            report["float64_scan_s"] = round(full_scan_s, 4)
+            reports.append(report)
+            del store
+
+    for r in reports:
+        k = r["k"]
+        print(
+            f"{r['dtype']:8} recall@{k} {r[f'recall_at_{k}_mean']:.4f} (min {r[f'recall_at_{k}_min']:.2f})  "
+            f"|err| mean {r['score_abs_err_mean']:.2e} max {r['score_abs_err_max']:.2e}  "
+            f"{r['bytes_per_vector']} B/vec ({r['compression_vs_float64']}x smaller)  "
+            f"scan {r['scan_s']:.3f}s vs {r['float64_scan_s']:.3f}s"
+        )
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+        print(f"wrote {args.out}")
+
+if __name__ == "__main__":
+    main()
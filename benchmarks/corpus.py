@@ -0,0 +1,142 @@
+"""
+Synthetic benchmark corpus: resumes as TXT / DOCX / PDF files plus job descriptions.
+
+    python -m benchmarks.corpus OUT_DIR [n_resumes]
+
+Everything is seeded, so the same size always gives the same corpus.
+"""
+import os
+import random
+import sys
+from typing import List, Tuple
+
+from docx import Document
+
+from .bench_tokenize_skills import synthetic_resume
+
+FORMATS = (".txt", ".docx", ".pdf")
+
+SENSITIVE_LINES = (
+    "Age: 34 years old",
+    "Pronouns: she/her",
+    "US citizen, no visa sponsorship needed",
+    "Married, two kids",
+    "Volunteer at the local Hindu temple",
+)
+
+JD_TITLES = ("Data Analyst", "Product Analyst", "Analytics Engineer", "BI Developer", "Data Scientist")
+
+JD_SKILLS = (
+    "sql", "python", "tableau", "power bi", "looker", "a/b testing", "experimentation",
+    "cohort analysis", "funnel analysis", "etl", "data pipelines", "snowflake", "bigquery",
+    "statistics", "machine learning", "nlp", "stakeholder management", "jira",
+)
+
+def resume_text(rng: random.Random) -> str:
+    """
+    A resume with section headers, a years-of-experience line and (for some)
+    sensitive terms, so every pipeline stage has real work to do.
+    """
+    skills = ", ".join(rng.sample(JD_SKILLS, rng.randint(3, 10)))
+    parts = [
+        "SUMMARY",
+        f"Analyst with {rng.randint(1, 12)} years of experience.",
+        "SKILLS",
+        skills,
+        "EXPERIENCE",
+        synthetic_resume(rng),
+    ]
+    if rng.random() < 0.4:
+        parts.append(rng.choice(SENSITIVE_LINES))
+    parts += ["EDUCATION", "B.S. Statistics"]
+    return "\n".join(parts)
+
+def jd_text(rng: random.Random) -> str:
+    skills = rng.sample(JD_SKILLS, rng.randint(6, 12))
+    return "\n".join(
+        [
+            f"{rng.choice(JD_TITLES)}",
+            "About the team: fast-paced analytics group.",
+            "Requirements",
+            *(f"- {rng.randint(2, 6)}+ years with {s}" if i == 0 else f"- {s}" for i, s in enumerate(skills)),
+        ]
+    )
+
+def _pdf_escape(line: str) -> str:
+    line = line.replace("•", "-").encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 60) -> None:
+    """
+    Minimal text-only PDF (Helvetica, one text object per page) that pdfplumber can read.
+    """
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    n = len(pages)
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, contents) pairs
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(n)), n)).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, page in enumerate(pages):
+        body = "BT /F1 10 Tf 12 TL 50 780 Td " + " ".join(f"({_pdf_escape(ln)}) Tj T*" for ln in page) + " ET"
+        stream = body.encode("latin-1")
+        objs.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+            ).encode()
+        )
+        objs.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+def write_docx(path: str, lines: List[str]) -> None:
+    doc = Document()
+    for ln in lines:
+        doc.add_paragraph(ln)
+    doc.save(path)
+
+def write_resume(path: str, text: str) -> None:
+    ext = os.path.splitext(path)[1]
+    if ext == ".pdf":
+        write_pdf(path, text.splitlines())
+    elif ext == ".docx":
+        write_docx(path, text.splitlines())
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+def build_corpus(out_dir: str, n_resumes: int, n_jds: int = 5, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Write `n_resumes` resume files (cycling TXT, DOCX, PDF) into `out_dir`
+    and return (resume paths, JD texts). Existing files are reused.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n_resumes):
+        text = resume_text(rng)
+        path = os.path.join(out_dir, f"resume_{i:05d}{FORMATS[i % len(FORMATS)]}")
+        if not os.path.exists(path):
+            write_resume(path, text)
+        paths.append(path)
+    jds = [jd_text(rng) for _ in range(n_jds)]
+    return paths, jds
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    paths, _ = build_corpus(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 100)
+    print(f"wrote {len(paths)} resumes to {sys.argv[1]}")
@@ -0,0 +1,163 @@
+"""
+Local stand-in for the OpenAI endpoints the app uses (embeddings, chat
+completions with and without streaming), with configurable latency.
+
+    with FakeOpenAI(latency_s=0.05) as server:
+        ...  # OPENAI_BASE_URL / OPENAI_API_KEY point at it inside the block
+
+Embeddings are deterministic per text (seeded by its hash), so scores are
+stable across runs. Nothing is ever sent over the network.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+import numpy as np
+
+FAKE_SKILLS = ["sql", "python", "tableau", "a/b testing", "etl", "statistics", "snowflake", "looker"]
+
+FAKE_EXPLANATION = (
+    "- Strong SQL and Python evidence in recent roles\n"
+    "- Built dashboards in Tableau for product teams\n"
+    "- Gap: no direct experimentation ownership mentioned\n"
+    "- Experience level roughly matches the requirement"
+)
+
+def fake_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeOpenAI"
+
+    def log_message(self, *args) -> None:  # keep benchmark output clean
+        pass
+
+    def _send_json(self, payload: Dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency_s)
+        if self.path.endswith("/embeddings"):
+            self.server.count("embeddings", len(req["input"]) if isinstance(req["input"], list) else 1)
+            self._embeddings(req)
+        elif self.path.endswith("/chat/completions"):
+            self.server.count("chat", 1)
+            self._chat(req)
+        else:
+            self.send_error(404)
+
+    def _embeddings(self, req: Dict) -> None:
+        texts = req["input"] if isinstance(req["input"], list) else [req["input"]]
+        as_b64 = req.get("encoding_format") == "base64"
+        data = []
+        for i, t in enumerate(texts):
+            vec = fake_vector(t, self.server.dim)
+            emb = base64.b64encode(vec.tobytes()).decode("ascii") if as_b64 else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        tokens = sum(len(t) // 4 + 1 for t in texts)
+        self._send_json({
+            "object": "list",
+            "data": data,
+            "model": req.get("model", ""),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat(self, req: Dict) -> None:
+        prompt = req["messages"][-1]["content"]
+        content = json.dumps({"skills": FAKE_SKILLS}) if "Return ONLY valid JSON" in prompt else FAKE_EXPLANATION
+        model = req.get("model", "")
+        if not req.get("stream"):
+            self._send_json({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4, "total_tokens": 0},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for piece in content.splitlines(keepends=True):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.write(b"data: [DONE]\n\n")
+
+class FakeOpenAI(ThreadingHTTPServer):
+    """
+    Threaded local server; as a context manager it also points the OpenAI
+    client env vars at itself (and restores them on exit).
+    """
+    daemon_threads = True
+
+    def __init__(self, latency_s: float = 0.0, dim: int = 1536, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_s = latency_s
+        self.dim = dim
+        self.requests: Dict[str, int] = {"embeddings": 0, "chat": 0}
+        self.inputs: Dict[str, int] = {"embeddings": 0, "chat": 0}
+        self._count_lock = threading.Lock()
+        self._saved_env: Dict[str, Optional[str]] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count(self, kind: str, n_inputs: int) -> None:
+        with self._count_lock:
+            self.requests[kind] += 1
+            self.inputs[kind] += n_inputs
+
+    def __enter__(self) -> "FakeOpenAI":
+        threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True).start()
+        for key, value in (("OPENAI_BASE_URL", self.base_url), ("OPENAI_API_KEY", "sk-fake")):
+            self._saved_env[key] = os.environ.get(key)
+            os.environ[key] = value
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._count_lock:
+            return {"requests": dict(self.requests), "inputs": dict(self.inputs)}
+
+def reset_openai_clients() -> None:
+    """
+    Drop the app's shared OpenAI client so the next call picks up OPENAI_BASE_URL.
+    """
+    from src import openai_utils
+    openai_utils._async_client = None
+
+def fake_counts_delta(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for group in ("requests", "inputs"):
+        for kind, value in after[group].items():
+            out[f"{kind}_{group}"] = value - before[group][kind]
+    return out
@@ -1,23 +1,42 @@
 import json
-from typing import List, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict
 
 from src.config import Settings
-from src.text_utils import extract_sections, tokenize_skills, extract_jd_relevant_block, normalize
-from src.ranker import rank_candidates
-from src.explain import generate_explanation
-from src.openai_utils import get_client
+from src.ranker import JDInput, JDProfile, build_ranking, jd_profile
+from src.explain import generate_explanation, generate_explanations
+from src.openai_utils import chat_completion
+from src.cache import get_response_cache, get_text_cache
+from src.io_utils import ParsedResume, ResumeSource, load_resume_files
 
-def jd_skills_rule_agent(jd_text: str) -> List[str]:
-    jd = normalize(jd_text)
-    sections = extract_sections(jd)
-    jd_block = sections.get("skills", "") or extract_jd_relevant_block(jd)
-    return tokenize_skills(jd_block)
+def resume_parsing_agent(
+    sources: List[ResumeSource], settings: Settings, names: Optional[List[str]] = None
+) -> List[ParsedResume]:
+    """
+    Bulk parse resumes (paths or in-memory uploads) with a per-file time + page
+    budget, skipping files whose extracted text is already cached.
+    """
+    return load_resume_files(
+        sources,
+        names=names,
+        max_workers=settings.parse_max_workers or None,
+        timeout_s=settings.parse_timeout_s,
+        max_pages=settings.parse_max_pages,
+        cache=get_text_cache(settings),
+    )
+
+def jd_profile_agent(jd_text: str, settings: Settings) -> JDProfile:
+    """
+    Normalize, section and rule-extract skills from the JD once (cached per JD).
+    """
+    return jd_profile(jd_text, settings)
+
+def jd_skills_rule_agent(jd_text: str, settings: Optional[Settings] = None) -> List[str]:
+    return jd_profile(jd_text, settings or Settings()).skills
 
 def jd_skills_llm_agent(jd_text: str, settings: Settings) -> List[str]:
     """
     Fallback agent: if rule extraction is weak, ask LLM to return a clean JSON skills list.
     """
-    client = get_client()
     prompt = f"""
 Extract job-relevant skills from the job description.
 
@@ -34,16 +53,15 @@ JOB DESCRIPTION:
 {jd_text}
 """.strip()
 
-    resp = client.chat.completions.create(
+    raw = chat_completion(
         model=settings.explanation_model,
         messages=[
             {"role": "system", "content": "You output strict JSON only."},
             {"role": "user", "content": prompt},
         ],
         temperature=0.2,
+        cache=get_response_cache(settings),
     )
-
-    raw = resp.choices[0].message.content.strip()
     try:
         data = json.loads(raw)
         skills = data.get("skills", [])
@@ -53,27 +71,15 @@ JOB DESCRIPTION:
         pass
     return []
 
-def ranking_agent(jd_text: str, resumes: List[Tuple[str, str]], settings: Settings):
+def ranking_agent(jd_text: JDInput, resumes: List[Tuple[str, str]], settings: Settings):
     """
-    Calls your existing ranker. Returns (results_list, df_ready_rows).
+    Calls your existing ranker. Returns (Ranking, ranked DataFrame); the Ranking
+    holds the candidates in a CandidateStore with their component scores, so it
+    can be re-weighted without re-running, and the DataFrame wraps its columns.
+    Pass the run's JDProfile so ranking scores against the skills shown to the user.
     """
-    results = rank_candidates(jd_text=jd_text, resumes=resumes, settings=settings)
-
-    rows = []
-    for r in results:
-        rows.append({
-            "Candidate": r.candidate_id,
-            "Resume File": r.filename,
-            "Overall Score": r.score,
-            "Embed Similarity": r.score_embed,
-            "Skill Match": r.score_skill,
-            "Exp Score": r.score_exp,
-            "Years Exp (guess)": r.years_exp_guess,
-            "Bias Flagged": r.bias_flagged,
-            "Bias Δ (orig - masked)": r.bias_score_delta,
-            "Sensitive Detected": ", ".join(r.bias_sensitive_found.keys()) if r.bias_sensitive_found else ""
-        })
-    return results, rows
+    ranking = build_ranking(jd_text=jd_text, resumes=resumes, settings=settings)
+    return ranking, ranking.results.to_frame()
 
 def explanation_agent(jd_text: str, candidate_result, settings: Settings) -> str:
     return generate_explanation(
@@ -83,4 +89,10 @@ def explanation_agent(jd_text: str, candidate_result, settings: Settings) -> str
         evidence_snippets=candidate_result.evidence_snippets,
         bias_sensitive_found=candidate_result.bias_sensitive_found,
         settings=settings,
-    )
\ No newline at end of file
+    )
+
+def explanation_agent_many(jd_text: str, candidate_results, settings: Settings) -> Dict[str, str]:
+    """
+    Concurrent explanations for several candidates (candidate_id -> text).
+    """
+    return generate_explanations(jd_text, candidate_results, settings)
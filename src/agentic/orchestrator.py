@@ -1,18 +1,23 @@
-from typing import List, Tuple
-import pandas as pd
+from typing import List, Optional, Tuple
 
+from src import metrics
 from src.config import Settings
+from src.io_utils import ResumeSource
+from src.cache import get_embedding_cache
+from src.openai_utils import configure_openai
 from src.agentic.state import AgenticState
 from src.agentic.agents import (
-    jd_skills_rule_agent,
+    resume_parsing_agent,
+    jd_profile_agent,
     jd_skills_llm_agent,
     ranking_agent,
-    explanation_agent,
+    explanation_agent_many,
 )
 
 class AgentOrchestrator:
     """
     Agentic pipeline:
+    - parsing agent (optional, when given files instead of text)
     - rule skills agent
     - fallback LLM skills agent if quality is low
     - ranking agent
@@ -20,26 +25,70 @@ class AgentOrchestrator:
     """
     def __init__(self, settings: Settings):
         self.settings = settings
+        configure_openai(settings)
 
     def run(
         self,
         jd_text: str,
-        resumes: List[Tuple[str, str]],
+        resumes: Optional[List[Tuple[str, str]]] = None,
         auto_explain_top_k: int = 0,
+        resume_files: Optional[List[Tuple[str, ResumeSource]]] = None,  # (filename, path/bytes/file)
     ) -> AgenticState:
         state = AgenticState(jd_text=jd_text)
+        with metrics.collect(self.settings.collect_metrics) as m:
+            self._run(state, jd_text, resumes, auto_explain_top_k, resume_files)
+        if m is not None:
+            state.metrics = m.to_dict()
+            top = list(state.metrics["spans"].items())[:3]
+            state.log(
+                f"Planner: run took {m.wall_s:.2f}s; slowest stages: "
+                + ", ".join(f"{name} {s['total_s']:.2f}s ({s['calls']} calls)" for name, s in top)
+                + "."
+            )
+        return state
+
+    def _run(
+        self,
+        state: AgenticState,
+        jd_text: str,
+        resumes: Optional[List[Tuple[str, str]]],
+        auto_explain_top_k: int,
+        resume_files: Optional[List[Tuple[str, ResumeSource]]],
+    ) -> None:
         state.log("Planner: starting agentic pipeline...")
+        resumes = list(resumes or [])
+
+        # 0) Parsing (optional)
+        if resume_files:
+            state.log(f"Parsing Agent: reading {len(resume_files)} files...")
+            parsed = resume_parsing_agent(
+                [src for _, src in resume_files], self.settings, names=[fn for fn, _ in resume_files]
+            )
+            for p in parsed:
+                if p.ok:
+                    resumes.append((p.filename, p.text))
+                else:
+                    state.parse_errors[p.filename] = p.error
+                    state.log(f"Parsing Agent: skipped {p.filename} ({p.error}).")
+            slowest = max(parsed, key=lambda p: p.seconds)
+            state.log(
+                f"Parsing Agent: parsed {sum(p.ok for p in parsed)}/{len(parsed)} files "
+                f"({sum(p.cached for p in parsed)} from text cache; "
+                f"slowest: {slowest.filename}, {slowest.seconds:.2f}s)."
+            )
 
         # 1) Skills (rule)
         state.log("JD Skills Agent (rule): extracting skills from JD...")
-        skills = jd_skills_rule_agent(jd_text)
+        profile = jd_profile_agent(jd_text, self.settings)
+        skills = profile.skills
 
         # 2) Decide fallback
         if len(skills) < 6:
             state.log(f"Planner: only {len(skills)} skills found → using LLM fallback.")
             llm_skills = jd_skills_llm_agent(jd_text, self.settings)
             if len(llm_skills) >= len(skills):
-                skills = llm_skills
+                profile = profile.with_skills(llm_skills, "llm")
+                skills = profile.skills
                 state.jd_skill_source = "llm"
                 state.log(f"JD Skills Agent (LLM): extracted {len(skills)} skills.")
             else:
@@ -48,22 +97,32 @@ class AgentOrchestrator:
             state.log(f"Planner: rule skills look good ({len(skills)} skills).")
 
         state.jd_skills = skills
+        state.jd_profile = profile
 
         # 3) Ranking
         state.log(f"Ranking Agent: scoring {len(resumes)} resumes...")
-        results, rows = ranking_agent(jd_text, resumes, self.settings)
-        state.results_obj = results
-        state.ranked_df = pd.DataFrame(rows)
+        cache = get_embedding_cache(self.settings)
+        before = cache.stats() if cache is not None else None
+        ranking, ranked_df = ranking_agent(profile, resumes, self.settings)
+        state.ranking = ranking
+        state.ranked_df = ranked_df
+        if cache is not None:
+            after = cache.stats()
+            state.log(
+                f"Ranking Agent: embedding cache {after['hits'] - before['hits']} hits, "
+                f"{after['misses'] - before['misses']} misses."
+            )
         state.log("Ranking Agent: done.")
 
         # 4) Explanations (optional)
         if auto_explain_top_k and auto_explain_top_k > 0:
-            k = min(auto_explain_top_k, len(results))
-            state.log(f"Explanation Agent: generating explanations for top {k} candidates...")
-            for r in results[:k]:
-                state.explanations[r.candidate_id] = explanation_agent(jd_text, r, self.settings)
+            k = min(auto_explain_top_k, len(ranking))
+            state.log(
+                f"Explanation Agent: generating explanations for top {k} candidates "
+                f"({min(k, self.settings.explain_max_parallel)} at a time)..."
+            )
+            state.explanations.update(explanation_agent_many(jd_text, ranking.by_row.take(ranking.order[:k]), self.settings))
             state.log("Explanation Agent: done.")
 
         state.resumes = {fn: txt for fn, txt in resumes}
-        state.log("Planner: pipeline complete.")
-        return state
\ No newline at end of file
+        state.log("Planner: pipeline complete.")
\ No newline at end of file
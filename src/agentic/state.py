@@ -1,3 +1,4 @@
+import json
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional
 
@@ -6,17 +7,32 @@ class AgenticState:
     jd_text: str = ""
     jd_skills: List[str] = field(default_factory=list)
     jd_skill_source: str = "rule"  # "rule" or "llm"
+    jd_profile: Optional[Any] = None  # JDProfile from ranker.py (the skills ranking used)
 
     # resumes: filename -> raw text
     resumes: Dict[str, str] = field(default_factory=dict)
+    parse_errors: Dict[str, str] = field(default_factory=dict)  # filename -> error
 
     # results
-    ranked_df: Any = None  # pandas DataFrame
-    results_obj: Optional[Any] = None  # list of CandidateResult from ranker.py
+    ranked_df: Any = None  # pandas DataFrame (wraps the ranking's columns)
+    ranking: Optional[Any] = None  # ranker.Ranking (CandidateStore + component scores, for re-weighting)
     explanations: Dict[str, str] = field(default_factory=dict)
 
     # logs (what makes it "agentic" + easy to demo)
     events: List[str] = field(default_factory=list)
 
+    # per-stage timings + counters (metrics.Metrics.to_dict), empty when disabled
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def results_obj(self) -> Optional[List[Any]]:
+        """
+        Ranked candidates (CandidateResult-like views), derived from `ranking`.
+        """
+        return list(self.ranking.results) if self.ranking is not None else None
+
     def log(self, msg: str) -> None:
-        self.events.append(msg)
\ No newline at end of file
+        self.events.append(msg)
+
+    def metrics_json(self) -> str:
+        return json.dumps(self.metrics, indent=2)
\ No newline at end of file
@@ -1,6 +1,9 @@
 import re
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple, Union
+
+from . import metrics
+from .text_utils import ResumeDocument
 
 # Simple rule-based scanning (portfolio-friendly)
 SENSITIVE_PATTERNS = {
@@ -11,36 +14,101 @@ SENSITIVE_PATTERNS = {
     "marital_parental": r"\b(married|single|divorced|mother|father|kids|children|pregnan)\b",
 }
 
+REDACTION = "[REDACTED]"
+
+def _compile_scanner(patterns: Dict[str, str]) -> Tuple["re.Pattern[str]", Dict[str, Tuple[int, ...]]]:
+    """
+    One named-group alternation for every category, plus the positions of each
+    category's own capture groups inside it (to rebuild its hit text).
+    """
+    parts = []
+    inner: Dict[str, Tuple[int, ...]] = {}
+    group = 0
+    for label, pat in patterns.items():
+        n_inner = re.compile(pat).groups
+        group += 1  # the named group itself
+        inner[label] = tuple(range(group + 1, group + 1 + n_inner))
+        group += n_inner
+        parts.append(f"(?P<{label}>{pat})")
+    return re.compile("|".join(parts), flags=re.IGNORECASE), inner
+
+# Compiled once at import
+_SCANNER, _INNER_GROUPS = _compile_scanner(SENSITIVE_PATTERNS)
+
+@dataclass
+class SensitiveSpan:
+    label: str
+    start: int
+    end: int
+    text: str
+
 @dataclass
 class BiasScan:
     found: Dict[str, List[str]]
     masked_text: str
+    # Character spans in the scanned text that were replaced with [REDACTED]
+    spans: List[SensitiveSpan] = field(default_factory=list)
 
-def scan_and_mask_sensitive(text: str) -> BiasScan:
+def _hit_text(m: "re.Match[str]", label: str) -> str:
+    """
+    Same hit string re.findall gave per category: the category's capture
+    groups joined (empty groups dropped), or the whole match if it has none.
     """
-    1) Detect sensitive patterns
+    groups = _INNER_GROUPS[label]
+    if not groups:
+        return m.group(label).strip()
+    if len(groups) == 1:
+        return (m.group(groups[0]) or "").strip()
+    return " ".join(g for g in (m.group(i) for i in groups) if g).strip()
+
+def mask_spans(text: str, spans: List[SensitiveSpan]) -> str:
+    """
+    Replace each (sorted, non-overlapping) span of `text` with [REDACTED].
+    """
+    pieces: List[str] = []
+    pos = 0
+    for sp in spans:
+        pieces.append(text[pos:sp.start])
+        pieces.append(REDACTION)
+        pos = sp.end
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+def scan_and_mask_sensitive(text: Union[str, ResumeDocument]) -> BiasScan:
+    """
+    1) Detect sensitive patterns (all categories in one pass)
     2) Create masked text replacing hits with [REDACTED]
+    A ResumeDocument is scanned once (normalized text) and the result reused.
     """
-    found: Dict[str, List[str]] = {}
-    masked = text or ""
-
-    for label, pat in SENSITIVE_PATTERNS.items():
-        hits = re.findall(pat, masked, flags=re.IGNORECASE)
-        flat_hits: List[str] = []
-        for h in hits:
-            if isinstance(h, tuple):
-                flat_hits.append(" ".join([x for x in h if x]).strip())
-            else:
-                flat_hits.append(str(h).strip())
-        flat_hits = [h for h in flat_hits if h]
-
-        if flat_hits:
-            # normalize + dedupe
-            uniq = list(dict.fromkeys([h.lower() for h in flat_hits]))
-            found[label] = uniq
-            masked = re.sub(pat, "[REDACTED]", masked, flags=re.IGNORECASE)
-
-    return BiasScan(found=found, masked_text=masked)
+    if isinstance(text, ResumeDocument):
+        return text.bias_scan
+    text = text or ""
+    with metrics.span("scan_and_mask_sensitive"):
+        metrics.count("bias_scan_chars", len(text))
+        return _scan(text)
+
+def _scan(text: str) -> BiasScan:
+    matches: List[Tuple[str, "re.Match[str]"]] = []
+    hits: Dict[str, List[str]] = {}
+
+    for m in _SCANNER.finditer(text):
+        label = m.lastgroup
+        matches.append((label, m))
+        h = _hit_text(m, label)
+        if h:
+            hits.setdefault(label, []).append(h.lower())
+
+    # A category is only reported (and masked) when it produced a non-empty hit
+    found: Dict[str, List[str]] = {
+        label: list(dict.fromkeys(hits[label])) for label in SENSITIVE_PATTERNS if label in hits
+    }
+    spans = [
+        SensitiveSpan(label=label, start=m.start(), end=m.end(), text=m.group(0))
+        for label, m in matches
+        if label in found
+    ]
+    masked = mask_spans(text, spans) if spans else text
+    return BiasScan(found=found, masked_text=masked, spans=spans)
 
 def bias_flag(delta: float, threshold: float) -> bool:
     """
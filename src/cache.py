@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import Settings
+from .text_utils import normalize
+
+def text_hash(text: str) -> str:
+    """
+    Content address for a piece of text (normalized first, so whitespace noise
+    doesn't create duplicate entries).
+    """
+    return hashlib.sha256(normalize(text).encode("utf-8")).hexdigest()
+
+def prompt_hash(messages: List[Dict[str, str]]) -> str:
+    """
+    Stable hash of a chat prompt (role + content of every message).
+    """
+    payload = json.dumps([[m.get("role", ""), m.get("content", "")] for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class _SqliteLRU:
+    """
+    Shared plumbing for the on-disk caches: one SQLite table with a
+    `last_used` column, a row cap, and hit/miss/eviction counters.
+    """
+    table = ""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create()
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_lru ON {self.table}(last_used)")
+        self._conn.commit()
+
+    def _create(self) -> None:
+        raise NotImplementedError
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        over = count - self.max_entries
+        if over > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"(SELECT rowid FROM {self.table} ORDER BY last_used ASC LIMIT ?)",
+                (over,),
+            )
+            self.evictions += over
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+class EmbeddingCache(_SqliteLRU):
+    """
+    On-disk embedding cache (SQLite), keyed by (model, hash of normalized text).
+    Keeps at most `max_entries` vectors; least recently used rows are evicted first.
+    """
+    table = "embeddings"
+
+    def __init__(self, path: str, max_entries: int = 50_000):
+        super().__init__(path, max_entries)
+
+    def _create(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vec BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+
+    def get_many(self, texts: List[str], model: str) -> List[Optional[List[float]]]:
+        """
+        Look up vectors for `texts`; None where the cache has no entry.
+        """
+        hashes = [text_hash(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        uniq = list(dict.fromkeys(hashes))
+
+        with self._lock:
+            # Chunk the IN (...) list to stay under SQLite's variable limit
+            for i in range(0, len(uniq), 500):
+                part = uniq[i:i + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vec FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float64).tolist()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, h) for h in found],
+                )
+                self._conn.commit()
+
+        out = [found.get(h) for h in hashes]
+        hit_count = sum(1 for v in out if v is not None)
+        self.hits += hit_count
+        self.misses += len(out) - hit_count
+        return out
+
+    def put_many(self, texts: List[str], vectors: List[List[float]], model: str) -> None:
+        now = time.time()
+        rows = [
+            (model, text_hash(t), np.asarray(v, dtype=np.float64).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vec, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._conn.commit()
+
+class ResponseCache(_SqliteLRU):
+    """
+    On-disk cache of chat completions keyed by (model, prompt hash, temperature).
+    Entries expire after `ttl_s`; past `max_entries` the least recently used go first.
+    """
+    table = "responses"
+
+    def __init__(self, path: str, max_entries: int = 5_000, ttl_s: float = 7 * 24 * 3600):
+        self.ttl_s = ttl_s
+        super().__init__(path, max_entries)
+
+    def _create(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, prompt_hash, temperature)
+            )
+            """
+        )
+
+    def get(self, model: str, messages: List[Dict[str, str]], temperature: float) -> Optional[str]:
+        key = (model, prompt_hash(messages), float(temperature))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE model = ? AND prompt_hash = ? AND temperature = ?",
+                key,
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl_s:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE model = ? AND prompt_hash = ? AND temperature = ?", key
+                )
+                self._conn.commit()
+                self.evictions += 1
+                row = None
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE model = ? AND prompt_hash = ? AND temperature = ?",
+                    (now, *key),
+                )
+                self._conn.commit()
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, model: str, messages: List[Dict[str, str]], temperature: float, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(model, prompt_hash, temperature, response, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (model, prompt_hash(messages), float(temperature), response, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        cur = self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_s,))
+        self.evictions += max(cur.rowcount, 0)
+        super()._evict()
+
+class TextCache(_SqliteLRU):
+    """
+    Cache of extracted resume text, keyed by a content key built from the
+    file bytes + extractor version (see io_utils.text_cache_key). `path` may
+    be ":memory:" to keep it off disk.
+    """
+    table = "parsed_text"
+
+    def __init__(self, path: str, max_entries: int = 20_000):
+        super().__init__(path, max_entries)
+
+    def _create(self) -> None:
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS parsed_text (
+                content_key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM parsed_text WHERE content_key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE parsed_text SET last_used = ? WHERE content_key = ?", (time.time(), key))
+                self._conn.commit()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed_text (content_key, text, last_used) VALUES (?, ?, ?)",
+                (key, text, time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+_EMBED_CACHES: Dict[str, EmbeddingCache] = {}
+_RESPONSE_CACHES: Dict[str, ResponseCache] = {}
+_TEXT_CACHES: Dict[str, TextCache] = {}
+
+def get_embedding_cache(settings: Settings) -> Optional[EmbeddingCache]:
+    """
+    Process-wide cache instance per directory (Streamlit reruns reuse the connection).
+    Returns None when caching is turned off in settings.
+    """
+    if not settings.use_embedding_cache:
+        return None
+    path = os.path.join(settings.cache_dir, "embeddings.sqlite")
+    cache = _EMBED_CACHES.get(path)
+    if cache is None:
+        cache = EmbeddingCache(path, max_entries=settings.embed_cache_max_entries)
+        _EMBED_CACHES[path] = cache
+    cache.max_entries = settings.embed_cache_max_entries
+    return cache
+
+def get_response_cache(settings: Settings) -> Optional[ResponseCache]:
+    """
+    Process-wide LLM response cache shared by explanations and JD skill extraction.
+    Returns None when caching is turned off in settings.
+    """
+    if not settings.use_response_cache:
+        return None
+    path = os.path.join(settings.cache_dir, "responses.sqlite")
+    cache = _RESPONSE_CACHES.get(path)
+    if cache is None:
+        cache = ResponseCache(path, max_entries=settings.response_cache_max_entries, ttl_s=settings.response_cache_ttl_s)
+        _RESPONSE_CACHES[path] = cache
+    cache.max_entries = settings.response_cache_max_entries
+    cache.ttl_s = settings.response_cache_ttl_s
+    return cache
+
+def get_text_cache(settings: Settings) -> Optional[TextCache]:
+    """
+    Process-wide parsed-text cache. Resume text is personal data, so it stays
+    in memory unless settings.archive_uploads already keeps the uploads on
+    disk. Returns None when caching is turned off.
+    """
+    if not settings.use_text_cache:
+        return None
+    path = os.path.join(settings.cache_dir, "parsed_text.sqlite")
+    if not settings.archive_uploads:
+        path = f"{path}:memory"  # registry key only; nothing is written there
+    cache = _TEXT_CACHES.get(path)
+    if cache is None:
+        cache = TextCache(
+            path if settings.archive_uploads else ":memory:",
+            max_entries=settings.text_cache_max_entries,
+        )
+        _TEXT_CACHES[path] = cache
+    cache.max_entries = settings.text_cache_max_entries
+    return cache
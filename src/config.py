@@ -2,12 +2,61 @@ from dataclasses import dataclass
 
 @dataclass(frozen=True)
 class Settings:
-    # Embeddings model
+    # Embeddings model: an OpenAI model name, or "local-hashing" / "local-hashing-<dim>"
+    # for the offline in-process backend (src/embeddings.py; no API key or network needed)
     embedding_model: str = "text-embedding-3-small"
 
+    # Embedding request packing (stay under the endpoint's per-request limits)
+    embed_batch_max_inputs: int = 512
+    embed_batch_max_tokens: int = 250_000
+
+    # Resumes longer than this (chars) are embedded as chunks and pooled
+    embed_chunk_chars: int = 8000
+
+    # On-disk caches (embeddings keyed by model + normalized text hash)
+    cache_dir: str = ".cache"
+    use_embedding_cache: bool = True
+    embed_cache_max_entries: int = 50_000
+
+    # Quantized, memory-mapped resume vectors for rank_matrix ("" = keep vectors in memory)
+    vector_store_dir: str = ""
+    vector_store_dtype: str = "int8"  # or "float16"
+
+    # LLM response cache (explanations + JD skill extraction), keyed by model/prompt/temperature
+    use_response_cache: bool = True
+    response_cache_max_entries: int = 5_000
+    response_cache_ttl_s: float = 7 * 24 * 3600
+
+    # Extracted resume text (PII), keyed by file-bytes hash + extractor version.
+    # Held in process memory; written to cache_dir only with archive_uploads
+    use_text_cache: bool = True
+    text_cache_max_entries: int = 2_000
+
+    # Shared OpenAI client: max requests in flight + retry/backoff on 429 / 5xx
+    openai_max_concurrency: int = 8
+    openai_max_retries: int = 5
+    openai_backoff_base_s: float = 0.5
+    openai_backoff_max_s: float = 20.0
+    openai_timeout_s: float = 60.0
+
+    # Bulk resume parsing (process pool); 0 workers = one per CPU
+    parse_max_workers: int = 0
+    parse_timeout_s: float = 30.0
+    parse_max_pages: int = 25
+
+    # Uploads are parsed in memory; set True to also keep a copy in data/uploads
+    # (and their extracted text in cache_dir/parsed_text.sqlite)
+    archive_uploads: bool = False
+
+    # Per-stage timings + counters for agentic runs (AgenticState.metrics)
+    collect_metrics: bool = True
+
     # Explanation model (used for recruiter-facing explanations)
     explanation_model: str = "gpt-4o-mini"
 
+    # Max explanations generated concurrently (auto-explain top K)
+    explain_max_parallel: int = 4
+
     # Hybrid scoring weights
     w_embed: float = 0.55   # semantic similarity (resume ↔ JD)
     w_skill: float = 0.30   # skill overlap
@@ -0,0 +1,71 @@
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+
+class EmbeddingBackend:
+    """
+    Something that turns texts into fixed-size vectors in-process. Selected by
+    Settings.embedding_model; model names no backend claims go to OpenAI.
+    """
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+class HashingBackend(EmbeddingBackend):
+    """
+    Offline, network-free embeddings: hashed word unigrams + bigrams,
+    sublinear TF, L2-normalized. Stateless (nothing to fit), so a text always
+    gets the same vector and the embedding cache stays valid across runs.
+    """
+    def __init__(self, n_features: int = 1024):
+        self.n_features = n_features
+        self._vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=(1, 2),
+            alternate_sign=False,
+            norm=None,
+            lowercase=True,
+        )
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        m = self._vectorizer.transform(texts).tocsr()
+        m.data = 1.0 + np.log(m.data)  # sublinear TF: long resumes don't drown short ones
+        dense = m.toarray()
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (dense / norms).tolist()
+
+# Model name pattern -> backend factory (called with the regex match)
+_BACKENDS: Dict[str, Callable[["re.Match[str]"], EmbeddingBackend]] = {
+    r"local-hashing(?:-(\d+))?": lambda m: HashingBackend(int(m.group(1) or 1024)),
+}
+_instances: Dict[str, EmbeddingBackend] = {}
+_lock = threading.Lock()
+
+def register_backend(pattern: str, factory: Callable[["re.Match[str]"], EmbeddingBackend]) -> None:
+    """
+    Route model names fully matching `pattern` to a custom backend.
+    """
+    with _lock:
+        _BACKENDS[pattern] = factory
+        _instances.clear()
+
+def get_backend(model: str) -> Optional[EmbeddingBackend]:
+    """
+    Local backend for `model`, or None if it is an OpenAI model name.
+    """
+    with _lock:
+        backend = _instances.get(model)
+        if backend is not None:
+            return backend
+        for pattern, factory in _BACKENDS.items():
+            m = re.fullmatch(pattern, model)
+            if m:
+                backend = factory(m)
+                _instances[model] = backend
+                return backend
+    return None
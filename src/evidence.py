@@ -0,0 +1,82 @@
+from bisect import bisect_right
+from typing import Dict, List
+
+class LineIndex:
+    """
+    Per-resume evidence index over already-normalized text: the non-empty lines,
+    lowercased once, plus a memoized skill term -> line numbers map.
+    """
+    def __init__(self, text_n: str):
+        self.lines: List[str] = [ln.strip() for ln in (text_n or "").splitlines() if ln.strip()]
+        low_lines = [ln.lower() for ln in self.lines]
+        self._low = "\n".join(low_lines)
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        pos = 0
+        for ln in low_lines:
+            self._starts.append(pos)
+            self._ends.append(pos + len(ln))
+            pos += len(ln) + 1
+        self._postings: Dict[str, List[int]] = {}
+
+    def lines_for(self, term: str) -> List[int]:
+        """
+        Line numbers (ascending) whose lowercased text contains `term`.
+        """
+        term = term.lower()
+        hits = self._postings.get(term)
+        if hits is not None:
+            return hits
+
+        if not term:
+            hits = list(range(len(self.lines)))
+        else:
+            hits = []
+            pos = self._low.find(term)
+            while pos != -1:
+                ln = bisect_right(self._starts, pos) - 1
+                if pos + len(term) <= self._ends[ln]:
+                    hits.append(ln)
+                    pos = self._low.find(term, self._ends[ln] + 1)  # one hit per line is enough
+                else:
+                    pos = self._low.find(term, pos + 1)  # match spans a line break
+        self._postings[term] = hits
+        return hits
+
+    def snippets(self, skills: List[str], max_snips: int = 6) -> List[str]:
+        """
+        Evidence lines skill by skill, in line order (a line can repeat for
+        several skills), capped at `max_snips`.
+        """
+        snips: List[str] = []
+        for skill in skills:
+            for i in self.lines_for(skill):
+                snips.append(self.lines[i])
+                if len(snips) >= max_snips:
+                    return snips
+        return snips
+
+    def coverage(self, skills: List[str]) -> Dict[int, List[str]]:
+        """
+        Line number -> the given skills that line mentions.
+        """
+        cov: Dict[int, List[str]] = {}
+        for skill in skills:
+            for i in self.lines_for(skill):
+                cov.setdefault(i, []).append(skill)
+        return cov
+
+    def ranked_snippets(self, skills: List[str], max_snips: int = 6) -> List[str]:
+        """
+        Distinct evidence lines ordered by how many of `skills` they cover
+        (ties keep resume order).
+        """
+        cov = self.coverage(skills)
+        best = sorted(cov, key=lambda i: (-len(cov[i]), i))
+        return [self.lines[i] for i in best[:max_snips]]
+
+    def by_skill(self, skills: List[str]) -> Dict[str, List[str]]:
+        """
+        Skill -> evidence lines, for drill-down views.
+        """
+        return {skill: [self.lines[i] for i in self.lines_for(skill)] for skill in skills}
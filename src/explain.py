@@ -1,20 +1,17 @@
-from typing import Dict, List
-from .openai_utils import get_client
+import asyncio
+from typing import Dict, Iterator, List, Sequence
+from . import metrics
+from .openai_utils import achat_completion, chat_completion, run_sync, stream_chat_completion
 from .config import Settings
+from .cache import get_response_cache
 
-def generate_explanation(
+def _explanation_messages(
     jd_text: str,
     matched_skills: List[str],
     missing_skills: List[str],
     evidence_snippets: List[str],
     bias_sensitive_found: Dict[str, List[str]],
-    settings: Settings
-) -> str:
-    """
-    LLM explanation: recruiter-friendly bullets grounded in evidence.
-    """
-    client = get_client()
-
+) -> List[Dict[str, str]]:
     prompt = f"""
 You are an ATS assistant helping a recruiter understand a candidate-job match.
 Write 6–10 concise bullets that are:
@@ -41,12 +38,84 @@ SENSITIVE INFO DETECTED (for bias review only; do not reference in explanation):
 Return only the bullets.
 """.strip()
 
-    resp = client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You produce fair, structured, recruiter-ready explanations."},
+        {"role": "user", "content": prompt},
+    ]
+
+def generate_explanation(
+    jd_text: str,
+    matched_skills: List[str],
+    missing_skills: List[str],
+    evidence_snippets: List[str],
+    bias_sensitive_found: Dict[str, List[str]],
+    settings: Settings
+) -> str:
+    """
+    LLM explanation: recruiter-friendly bullets grounded in evidence.
+    """
+    metrics.count("explanations")
+    with metrics.span("generate_explanation"):
+        return chat_completion(
+            model=settings.explanation_model,
+            messages=_explanation_messages(
+                jd_text, matched_skills, missing_skills, evidence_snippets, bias_sensitive_found
+            ),
+            temperature=0.2,
+            cache=get_response_cache(settings),
+        )
+
+def stream_explanation(
+    jd_text: str,
+    matched_skills: List[str],
+    missing_skills: List[str],
+    evidence_snippets: List[str],
+    bias_sensitive_found: Dict[str, List[str]],
+    settings: Settings
+) -> Iterator[str]:
+    """
+    Same explanation as generate_explanation, yielded token by token.
+    """
+    return stream_chat_completion(
         model=settings.explanation_model,
-        messages=[
-            {"role": "system", "content": "You produce fair, structured, recruiter-ready explanations."},
-            {"role": "user", "content": prompt},
-        ],
+        messages=_explanation_messages(
+            jd_text, matched_skills, missing_skills, evidence_snippets, bias_sensitive_found
+        ),
         temperature=0.2,
+        cache=get_response_cache(settings),
     )
-    return resp.choices[0].message.content.strip()
+
+def generate_explanations(jd_text: str, candidates: Sequence, settings: Settings) -> Dict[str, str]:
+    """
+    Explanations for many CandidateResults at once, at most
+    `settings.explain_max_parallel` in flight. Returns candidate_id -> text.
+    """
+    if not candidates:
+        return {}
+
+    cache = get_response_cache(settings)
+
+    async def run_all() -> List[str]:
+        limit = asyncio.Semaphore(max(1, settings.explain_max_parallel))
+
+        async def one(c) -> str:
+            async with limit:
+                return await achat_completion(
+                    model=settings.explanation_model,
+                    messages=_explanation_messages(
+                        jd_text,
+                        c.matched_skills,
+                        c.missing_skills,
+                        c.evidence_snippets,
+                        c.bias_sensitive_found,
+                    ),
+                    temperature=0.2,
+                    cache=cache,
+                )
+
+        return list(await asyncio.gather(*(one(c) for c in candidates)))
+
+    with metrics.span("generate_explanations"):
+        texts = run_sync(run_all())
+    metrics.count("explanations", len(candidates))
+    return {c.candidate_id: t for c, t in zip(candidates, texts)}
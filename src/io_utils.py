@@ -1,46 +1,376 @@
+import hashlib
+import io
+import multiprocessing as mp
 import os
-from typing import List
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, BinaryIO, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
+import docx
 import pdfplumber
 from docx import Document
 
+from . import metrics
+from .cache import TextCache
+from .text_utils import section_header
+
 SUPPORTED_EXTS = {".pdf", ".docx", ".txt"}
 
-def read_txt(path: str) -> str:
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        return f.read()
+# Part of every parsed-text cache key: bump the leading number whenever the
+# extraction logic changes so stale text is parsed again.
+EXTRACTOR_VERSION = f"1/pdfplumber-{pdfplumber.__version__}/python-docx-{getattr(docx, '__version__', '?')}"
+
+# A resume can be read from a path, raw bytes, or a binary file-like object
+# (e.g. Streamlit's UploadedFile) without touching disk.
+ResumeSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+@dataclass
+class ParsedResume:
+    filename: str
+    text: str = ""
+    error: str = ""
+    seconds: float = 0.0
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+def _as_stream(source: ResumeSource) -> Union[str, BinaryIO]:
+    """
+    Path or seekable binary stream for pdfplumber / python-docx.
+    BytesIO over bytes shares the buffer until written, so this doesn't copy.
+    """
+    if isinstance(source, str):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+def _buffer(source: ResumeSource) -> Union[bytes, bytearray, memoryview]:
+    """
+    Raw bytes of a source, zero-copy for in-memory buffers where possible.
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data
+
+def _source_size(source: ResumeSource) -> int:
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    return len(memoryview(_buffer(source)).cast("B"))
+
+def read_txt(source: ResumeSource) -> str:
+    if isinstance(source, str):
+        with open(source, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+    return str(_buffer(source), "utf-8", "ignore")
 
-def read_docx(path: str) -> str:
-    doc = Document(path)
+def read_docx(source: ResumeSource) -> str:
+    doc = Document(_as_stream(source))
     parts = []
     for p in doc.paragraphs:
         if p.text:
             parts.append(p.text)
     return "\n".join(parts)
 
-def read_pdf(path: str) -> str:
+def read_pdf(source: ResumeSource, max_pages: Optional[int] = None, deadline: Optional[float] = None) -> str:
     """
     Extract text from PDF using pdfplumber.
     Note: Some PDFs are image-only scans; those will return minimal text
     unless you add OCR later.
+    Stops after `max_pages`; raises TimeoutError once `deadline`
+    (a time.perf_counter() value) has passed.
     """
     parts = []
-    with pdfplumber.open(path) as pdf:
-        for page in pdf.pages:
+    with pdfplumber.open(_as_stream(source)) as pdf:
+        for i, page in enumerate(pdf.pages):
+            if max_pages is not None and i >= max_pages:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                raise TimeoutError(f"PDF parsing exceeded time budget after {i} pages")
             page_text = page.extract_text() or ""
             if page_text.strip():
                 parts.append(page_text)
     return "\n".join(parts)
 
-def load_resume_file(path: str) -> str:
-    ext = os.path.splitext(path.lower())[1]
+def _ext(filename: str) -> str:
+    return os.path.splitext(filename.lower())[1]
+
+def text_cache_key(data: Union[bytes, bytearray, memoryview], ext: str, max_pages: Optional[int] = None) -> str:
+    """
+    Content key for extracted text: file bytes + type + extractor version + page cap.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:{ext}:{EXTRACTOR_VERSION}:{max_pages or 0}"
+
+def load_resume_file(
+    source: ResumeSource,
+    filename: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    deadline: Optional[float] = None,
+    cache: Optional[TextCache] = None,
+) -> str:
+    """
+    Extract text from a resume path, bytes or file-like object.
+    `filename` (for the extension) is required unless `source` is a path.
+    """
+    if filename is None:
+        if not isinstance(source, str):
+            filename = getattr(source, "name", None)
+        else:
+            filename = source
+    if not filename:
+        raise ValueError("filename is required when loading a resume from memory")
+
+    ext = _ext(filename)
     if ext not in SUPPORTED_EXTS:
         raise ValueError(f"Unsupported file type: {ext}. Supported: {SUPPORTED_EXTS}")
 
-    if ext == ".pdf":
-        return read_pdf(path)
-    if ext == ".docx":
-        return read_docx(path)
-    return read_txt(path)
+    key = None
+    if cache is not None:
+        key = text_cache_key(_buffer(source), ext, max_pages)
+        hit = cache.get(key)
+        if hit is not None:
+            metrics.count("text_cache_hits")
+            return hit
+        metrics.count("text_cache_misses")
+
+    with metrics.span("load_resume_file"):
+        if metrics.enabled():
+            metrics.count("files_parsed")
+            metrics.count("bytes_parsed", _source_size(source))
+        if ext == ".pdf":
+            text = read_pdf(source, max_pages=max_pages, deadline=deadline)
+        elif ext == ".docx":
+            text = read_docx(source)
+        else:
+            text = read_txt(source)
+
+    if cache is not None:
+        cache.put(key, text)
+    return text
+
+def _parse_one(
+    source: ResumeSource, filename: str, max_pages: Optional[int], timeout_s: float
+) -> Tuple[str, float]:
+    """
+    Worker entry point (must stay top-level so it pickles).
+    """
+    start = time.perf_counter()
+    text = load_resume_file(source, filename, max_pages=max_pages, deadline=start + timeout_s)
+    return text, time.perf_counter() - start
+
+def load_resume_files(
+    sources: List[ResumeSource],
+    names: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    timeout_s: float = 30.0,
+    max_pages: Optional[int] = 25,
+    min_pool_size: int = 4,
+    cache: Optional[TextCache] = None,
+) -> List[ParsedResume]:
+    """
+    Parse many resumes (paths, bytes or file-like uploads), one ParsedResume
+    per input in the same order. Big batches go through a process pool.
+    Failures and timeouts are reported per file instead of aborting the batch.
+    Files already in `cache` (same bytes + extractor version) are not parsed again.
+    Small batches (< min_pool_size) are parsed inline, straight from the
+    in-memory buffers; `timeout_s` is a hard per-file limit only in the pool
+    (inline, PDFs stop between pages and nothing else is interrupted).
+    """
+    if names is None:
+        names = [os.path.basename(s) if isinstance(s, str) else getattr(s, "name", "") for s in sources]
+    out = [ParsedResume(filename=n) for n in names]
+
+    todo = list(range(len(sources)))
+    keys: List[Optional[str]] = [None] * len(sources)
+    if cache is not None:
+        todo = []
+        for i, src in enumerate(sources):
+            try:
+                keys[i] = text_cache_key(_buffer(src), _ext(names[i]), max_pages)
+            except OSError as e:
+                out[i].error = f"{type(e).__name__}: {e}"
+                continue
+            hit = cache.get(keys[i])
+            if hit is None:
+                todo.append(i)
+            else:
+                out[i].text, out[i].cached = hit, True
+        metrics.count("text_cache_hits", sum(o.cached for o in out))
+        metrics.count("text_cache_misses", len(todo))
+
+    _parse_many([out[i] for i in todo], [sources[i] for i in todo], max_workers, timeout_s, max_pages, min_pool_size)
+
+    if cache is not None:
+        for i in todo:
+            if out[i].ok and keys[i] is not None:
+                cache.put(keys[i], out[i].text)
+    return out
+
+def _picklable(source: ResumeSource) -> Union[str, bytes]:
+    """
+    Paths and bytes pickle as-is; file-like buffers have to cross the
+    process boundary as bytes.
+    """
+    return source if isinstance(source, (str, bytes)) else bytes(_buffer(source))
+
+_MAIN_LOCK = threading.Lock()
+
+@contextmanager
+def _host_main_hidden() -> Iterator[None]:
+    """
+    Start spawn workers without re-importing the host's __main__. Under
+    Streamlit __main__ is app.py, which fails outside a session, so every
+    worker would die on startup; the parse workers only need src.io_utils.
+    """
+    main = sys.modules.get("__main__")
+    if main is None:
+        yield
+        return
+    with _MAIN_LOCK:
+        saved = {name: main.__dict__[name] for name in ("__file__", "__spec__") if name in main.__dict__}
+        main.__dict__.pop("__file__", None)
+        main.__spec__ = None
+        try:
+            yield
+        finally:
+            main.__dict__.pop("__spec__", None)
+            main.__dict__.update(saved)
+
+class _WorkerProcess(mp.get_context("spawn").Process):
+    """
+    Spawn process that starts with the host's __main__ hidden. Pool also
+    starts replacement workers from its handler thread long after the pool
+    was built, so the hiding has to happen on every start, not around Pool().
+    """
+    def start(self) -> None:
+        with _host_main_hidden():
+            super().start()
+
+class _WorkerContext(type(mp.get_context("spawn"))):
+    Process = _WorkerProcess
+
+def _worker_pool(workers: int):
+    # spawn: safe to start from threaded hosts (Streamlit, the OpenAI client loop)
+    return _WorkerContext().Pool(processes=workers)
+
+def _parse_many(
+    out: List[ParsedResume],
+    sources: List[ResumeSource],
+    max_workers: Optional[int],
+    timeout_s: float,
+    max_pages: Optional[int],
+    min_pool_size: int,
+) -> None:
+    """
+    Pooled files get `timeout_s` each, counted from when the file is handed
+    to a free worker. Inline files (small batches) have no hard timeout:
+    only PDFs check their deadline, and only between pages.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(sources))
+
+    if workers <= 1 or len(sources) < min_pool_size:
+        for item, src in zip(out, sources):
+            start = time.perf_counter()
+            try:
+                item.text, item.seconds = _parse_one(src, item.filename, max_pages, timeout_s)
+            except Exception as e:
+                item.error = f"{type(e).__name__}: {e}"
+                item.seconds = time.perf_counter() - start
+        return
+
+    todo = deque(range(len(sources)))
+    while todo:
+        _parse_round(out, sources, todo, min(workers, len(todo)), timeout_s, max_pages)
+
+def _parse_round(
+    out: List[ParsedResume],
+    sources: List[ResumeSource],
+    todo: Deque[int],
+    workers: int,
+    timeout_s: float,
+    max_pages: Optional[int],
+) -> None:
+    """
+    Feed files from `todo` to a fresh pool, at most one per free worker.
+    A worker whose file runs past its deadline is written off until that
+    file finishes after all (then it takes work again); once every worker is
+    stuck the pool is killed and the caller starts another round for
+    whatever is left.
+    """
+    pool = _worker_pool(workers)
+    finished: "queue.Queue[int]" = queue.Queue()
+    running: Dict[int, Tuple[Any, float]] = {}
+    written_off: Set[int] = set()
+    stuck = 0
+    try:
+        while running or (todo and stuck < workers):
+            while todo and len(running) + stuck < workers:
+                i = todo.popleft()
+                notify = partial(_notify, finished, i)
+                res = pool.apply_async(
+                    _parse_one,
+                    (_picklable(sources[i]), out[i].filename, max_pages, timeout_s),
+                    callback=notify,
+                    error_callback=notify,
+                )
+                running[i] = (res, time.perf_counter())
+
+            next_deadline = min(started for _, started in running.values()) + timeout_s
+            try:
+                i = finished.get(timeout=max(0.0, next_deadline - time.perf_counter()))
+            except queue.Empty:
+                now = time.perf_counter()
+                for i, (_, started) in list(running.items()):
+                    if now - started >= timeout_s:
+                        out[i].error = f"TimeoutError: no result after {timeout_s:.0f}s"
+                        out[i].seconds = now - started
+                        del running[i]
+                        written_off.add(i)
+                        stuck += 1
+                continue
+            if i in written_off:
+                # Reported as timed out already, but its worker is free again
+                written_off.discard(i)
+                stuck -= 1
+                continue
+            res, started = running.pop(i)
+            item = out[i]
+            try:
+                item.text, item.seconds = res.get(0)
+                # Worker processes can't report into this run; record for them
+                metrics.observe("load_resume_file", item.seconds)
+                if metrics.enabled():
+                    metrics.count("files_parsed")
+                    metrics.count("bytes_parsed", _source_size(sources[i]))
+            except Exception as e:
+                item.error = f"{type(e).__name__}: {e}"
+                item.seconds = time.perf_counter() - started
+    finally:
+        if stuck or running:
+            pool.terminate()  # kill workers still chewing on a bad file
+        else:
+            pool.close()
+        pool.join()
+
+def _notify(finished: "queue.Queue[int]", i: int, _result: Any) -> None:
+    finished.put(i)
 
 def safe_filename(name: str) -> str:
     """
@@ -55,18 +385,49 @@ def safe_filename(name: str) -> str:
 def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
-def chunk_text(text: str, max_chars: int = 4000) -> List[str]:
+def chunk_spans(text: str, max_chars: int = 4000) -> List[Tuple[int, int]]:
     """
-    Split long text to reduce token/embedding issues if you expand later.
+    (start, end) offsets of chunks of at most `max_chars`. Text that fits is a
+    single chunk; longer text is cut at section headers (once a chunk is at
+    least half full), otherwise at line breaks, and only as a last resort
+    mid-line.
     """
-    text = (text or "").strip()
-    if not text:
+    if not (text or "").strip():
         return []
     if len(text) <= max_chars:
-        return [text]
-    chunks = []
-    i = 0
-    while i < len(text):
-        chunks.append(text[i:i+max_chars])
-        i += max_chars
+        return [(0, len(text))]
+
+    chunks: List[Tuple[int, int]] = []
+    cur_start: Optional[int] = None
+    cur_end = 0
+    pos = 0
+    for ln in text.splitlines(keepends=True):
+        start, end = pos, pos + len(ln)
+        pos = end
+
+        if cur_start is not None and (
+            end - cur_start > max_chars
+            or (section_header(ln) and cur_end - cur_start >= max_chars // 2)
+        ):
+            chunks.append((cur_start, cur_end))
+            cur_start = None
+
+        # A single line longer than the budget gets hard-split
+        while end - start > max_chars:
+            chunks.append((start, start + max_chars))
+            start += max_chars
+
+        if cur_start is None:
+            cur_start = start
+        cur_end = end
+
+    if cur_start is not None and cur_end > cur_start:
+        chunks.append((cur_start, cur_end))
     return chunks
+
+def chunk_text(text: str, max_chars: int = 4000) -> List[str]:
+    """
+    Split long text to reduce token/embedding issues (see chunk_spans).
+    """
+    text = (text or "").strip()
+    return [text[s:e] for s, e in chunk_spans(text, max_chars)]
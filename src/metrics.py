@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Metrics:
+    """
+    Timed spans (calls / total / max seconds per name) and integer counters
+    for one pipeline run. Thread-safe: the OpenAI client loop reports into
+    the same object as the caller (see bind()).
+    """
+    def __init__(self):
+        self.spans: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.wall_s = 0.0
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            s = self.spans.get(name)
+            if s is None:
+                self.spans[name] = {"calls": 1, "total_s": seconds, "max_s": seconds}
+            else:
+                s["calls"] += 1
+                s["total_s"] += seconds
+                s["max_s"] = max(s["max_s"], seconds)
+
+    def add(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = {
+                name: {
+                    "calls": int(s["calls"]),
+                    "total_s": round(s["total_s"], 6),
+                    "mean_ms": round(s["total_s"] / s["calls"] * 1e3, 3),
+                    "max_ms": round(s["max_s"] * 1e3, 3),
+                }
+                for name, s in sorted(self.spans.items(), key=lambda kv: -kv[1]["total_s"])
+            }
+            return {"wall_s": round(self.wall_s, 6), "spans": spans, "counters": dict(sorted(self.counters.items()))}
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+# The collector for the run in progress in this context (None = instrumentation
+# off). A context variable, so concurrent runs (e.g. Streamlit sessions, each on
+# its own thread) only see their own calls.
+_active: "ContextVar[Optional[Metrics]]" = ContextVar("metrics_active", default=None)
+
+class _NoSpan:
+    """
+    Shared do-nothing context manager handed out while no run is being collected.
+    """
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+_NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics: Metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.t0)
+
+def enabled() -> bool:
+    return _active.get() is not None
+
+def span(name: str):
+    """
+    `with span("stage"):` times the block when a run is being collected.
+    """
+    m = _active.get()
+    return _NO_SPAN if m is None else _Span(m, name)
+
+def count(name: str, n: int = 1) -> None:
+    m = _active.get()
+    if m is not None:
+        m.add(name, n)
+
+def observe(name: str, seconds: float) -> None:
+    """
+    Record a span timed elsewhere (e.g. in a parse worker process).
+    """
+    m = _active.get()
+    if m is not None:
+        m.observe(name, seconds)
+
+async def _bound(m: Metrics, coro: Awaitable[T]) -> T:
+    _active.set(m)  # the task runs in its own context copy, so this stays local to it
+    return await coro
+
+def bind(coro: Awaitable[T]) -> Awaitable[T]:
+    """
+    `coro`, reporting into the caller's run when it is awaited on another
+    thread's event loop (that thread doesn't share the caller's context).
+    """
+    m = _active.get()
+    return coro if m is None else _bound(m, coro)
+
+@contextmanager
+def collect(enable: bool = True) -> Iterator[Optional[Metrics]]:
+    """
+    Collect spans and counters until the block exits: from this context, and
+    from coroutines handed to other threads through bind(). Yields None (and
+    records nothing) when `enable` is False.
+    """
+    if not enable:
+        yield None
+        return
+    m = Metrics()
+    token = _active.set(m)
+    try:
+        yield m
+    finally:
+        m.wall_s = time.perf_counter() - m._start
+        _active.reset(token)
@@ -1,23 +1,377 @@
+import asyncio
 import os
-from typing import List
+import queue
+import random
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional
+
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+)
+
+from . import metrics
+from .cache import EmbeddingCache, ResponseCache
+from .config import Settings
+from .embeddings import get_backend
 
 load_dotenv()
 
-def get_client() -> OpenAI:
+# Embeddings endpoint limits (per request)
+EMBED_MAX_INPUTS = 2048
+EMBED_MAX_TOKENS = 300_000
+
+# Statuses worth retrying (rate limit + transient server errors)
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+_defaults = Settings()
+_limits: Dict[str, Any] = {
+    "max_concurrency": _defaults.openai_max_concurrency,
+    "max_retries": _defaults.openai_max_retries,
+    "backoff_base_s": _defaults.openai_backoff_base_s,
+    "backoff_max_s": _defaults.openai_backoff_max_s,
+    "timeout_s": _defaults.openai_timeout_s,
+}
+
+_lock = threading.Lock()
+_async_client: Optional[AsyncOpenAI] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+def _api_key() -> str:
     key = os.getenv("OPENAI_API_KEY")
     if not key:
         raise RuntimeError("Missing OPENAI_API_KEY. Add it to your .env file.")
-    return OpenAI(api_key=key)
+    return key
 
-def embed_texts(texts: List[str], model: str) -> List[List[float]]:
+def configure_openai(settings: Settings) -> None:
     """
-    Returns embeddings for a list of texts.
+    Apply concurrency / retry limits from settings to the shared client layer.
     """
-    client = get_client()
-    resp = client.embeddings.create(
-        model=model,
-        input=texts
-    )
+    global _semaphore
+    with _lock:
+        changed = _limits["max_concurrency"] != settings.openai_max_concurrency
+        _limits.update(
+            max_concurrency=settings.openai_max_concurrency,
+            max_retries=settings.openai_max_retries,
+            backoff_base_s=settings.openai_backoff_base_s,
+            backoff_max_s=settings.openai_backoff_max_s,
+            timeout_s=settings.openai_timeout_s,
+        )
+        if changed:
+            _semaphore = None  # rebuilt with the new limit on next use
+
+def get_async_client() -> AsyncOpenAI:
+    """
+    Shared async client. Only use it from the background loop (see run_sync).
+    """
+    global _async_client
+    key = _api_key()
+    with _lock:
+        if _async_client is None or _async_client.api_key != key:
+            limit = _limits["max_concurrency"]
+            _async_client = AsyncOpenAI(
+                api_key=key,
+                timeout=_limits["timeout_s"],
+                max_retries=0,  # retries are handled by _with_retries
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(max_connections=limit * 2, max_keepalive_connections=limit)
+                ),
+            )
+        return _async_client
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """
+    One long-lived event loop thread owns the async client, so the pooled
+    connections survive across Streamlit reruns and sync callers.
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="openai-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """
+    Run a coroutine on the shared client loop and block until it finishes.
+    It reports into the caller's metrics run, if any.
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run_sync() called from the client loop; await the coroutine instead.")
+    return asyncio.run_coroutine_threadsafe(metrics.bind(coro), loop).result()
+
+async def _gather(aws: List[Awaitable[Any]]) -> List[Any]:
+    return list(await asyncio.gather(*aws))
+
+def run_many(aws: List[Awaitable[Any]]) -> List[Any]:
+    """
+    Put many API coroutines in flight at once (bounded by the shared concurrency
+    limit) and return their results in order.
+    """
+    if not aws:
+        return []
+    return run_sync(_gather(aws))
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_limits["max_concurrency"])
+    return _semaphore
+
+def _is_retryable(err: Exception) -> bool:
+    if isinstance(err, APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(err, APIStatusError):
+        return err.status_code in RETRY_STATUSES or err.status_code >= 500
+    return False
+
+def _retry_delay(err: Exception, attempt: int) -> float:
+    """
+    Full-jitter exponential backoff; honours Retry-After when the API sends one.
+    """
+    cap = min(_limits["backoff_max_s"], _limits["backoff_base_s"] * (2 ** attempt))
+    delay = random.uniform(0, cap)
+    if isinstance(err, APIStatusError):
+        retry_after = err.response.headers.get("retry-after")
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+    return min(delay, _limits["backoff_max_s"])
+
+async def _with_retries(make_call):
+    """
+    Run `make_call()` under the shared concurrency limit, retrying 429/5xx and
+    connection errors. Backoff sleeps happen outside the limit.
+    """
+    attempt = 0
+    while True:
+        try:
+            async with _get_semaphore():
+                return await make_call()
+        except Exception as err:
+            if attempt >= _limits["max_retries"] or not _is_retryable(err):
+                raise
+            await asyncio.sleep(_retry_delay(err, attempt))
+            attempt += 1
+
+async def aembed_texts(texts: List[str], model: str) -> List[List[float]]:
+    client = get_async_client()
+    resp = await _with_retries(lambda: client.embeddings.create(model=model, input=texts))
     return [d.embedding for d in resp.data]
+
+async def achat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float = 0.2,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    if cache is not None:
+        hit = cache.get(model, messages, temperature)
+        if hit is not None:
+            metrics.count("response_cache_hits")
+            return hit
+        metrics.count("response_cache_misses")
+
+    metrics.count("chat_api_calls")
+    client = get_async_client()
+    resp = await _with_retries(
+        lambda: client.chat.completions.create(model=model, messages=messages, temperature=temperature)
+    )
+    text = resp.choices[0].message.content.strip()
+    if cache is not None:
+        cache.put(model, messages, temperature, text)
+    return text
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float = 0.2,
+    cache: Optional[ResponseCache] = None,
+) -> str:
+    """
+    Blocking chat completion through the shared async client (with retries).
+    Identical prompts are served from `cache` when one is given.
+    """
+    return run_sync(achat_completion(messages, model=model, temperature=temperature, cache=cache))
+
+async def achat_completion_stream(
+    messages: List[Dict[str, str]], model: str, temperature: float = 0.2
+) -> AsyncIterator[str]:
+    """
+    Stream content deltas. Only opening the stream is retried; once tokens
+    have been yielded an error is raised to the caller.
+    """
+    client = get_async_client()
+    sem = _get_semaphore()
+    stream = await _with_retries(
+        lambda: client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature, stream=True
+        )
+    )
+    async with sem, stream:  # closing the stream drops the connection if we stop early
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+def stream_chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float = 0.2,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[str]:
+    """
+    Blocking generator over a streamed chat completion (e.g. for st.write_stream).
+    A cached response is yielded in one piece; a fresh one is stored once complete.
+    Closing the generator early cancels the request.
+    """
+    if cache is not None:
+        hit = cache.get(model, messages, temperature)
+        if hit is not None:
+            metrics.count("response_cache_hits")
+            yield hit
+            return
+        metrics.count("response_cache_misses")
+
+    metrics.count("chat_api_calls")
+    q: "queue.Queue[Any]" = queue.Queue()
+    done = object()
+
+    async def pump() -> None:
+        try:
+            async for piece in achat_completion_stream(messages, model=model, temperature=temperature):
+                q.put(piece)
+        except Exception as err:
+            q.put(err)
+        finally:
+            q.put(done)
+
+    fut = asyncio.run_coroutine_threadsafe(metrics.bind(pump()), _background_loop())
+    pieces: List[str] = []
+    try:
+        while True:
+            item = q.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            pieces.append(item)
+            yield item
+    finally:
+        fut.cancel()  # no-op once the pump is done; otherwise stop reading the stream
+
+    if cache is not None:
+        cache.put(model, messages, temperature, "".join(pieces).strip())
+
+def embed_texts(texts: List[str], model: str) -> List[List[float]]:
+    """
+    Returns embeddings for a list of texts (in-process when `model` names a
+    local backend, see embeddings.py; otherwise from the OpenAI API).
+    """
+    with metrics.span("embed_texts"):
+        if metrics.enabled():
+            metrics.count("embed_inputs", len(texts))
+            metrics.count("embed_input_chars", sum(len(t) for t in texts))
+        backend = get_backend(model)
+        if backend is not None:
+            return backend.embed(texts)
+        metrics.count("embed_api_calls")
+        return run_sync(aembed_texts(texts, model=model))
+
+def approx_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 chars per token for English text).
+    """
+    return len(text or "") // 4 + 1
+
+def pack_batches(texts: List[str], max_inputs: int, max_tokens: int) -> List[List[int]]:
+    """
+    Greedily pack text indices into request-sized batches, keeping input order.
+    A single text over the token budget still gets its own batch.
+    """
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    cur_tokens = 0
+    for i, t in enumerate(texts):
+        n_tok = approx_tokens(t)
+        if cur and (len(cur) >= max_inputs or cur_tokens + n_tok > max_tokens):
+            batches.append(cur)
+            cur, cur_tokens = [], 0
+        cur.append(i)
+        cur_tokens += n_tok
+    if cur:
+        batches.append(cur)
+    return batches
+
+def embed_texts_batched(
+    texts: List[str],
+    model: str,
+    max_inputs: int = EMBED_MAX_INPUTS,
+    max_tokens: int = EMBED_MAX_TOKENS,
+) -> List[List[float]]:
+    """
+    Embed many texts in as few requests as the endpoint limits allow; the
+    requests run concurrently. Output order matches input order.
+    Local backends embed in-process, `max_inputs` texts at a time.
+    """
+    with metrics.span("embed_texts"):
+        return _embed_texts_batched(texts, model, max_inputs, max_tokens)
+
+def _embed_texts_batched(texts: List[str], model: str, max_inputs: int, max_tokens: int) -> List[List[float]]:
+    if metrics.enabled():
+        metrics.count("embed_inputs", len(texts))
+        metrics.count("embed_input_chars", sum(len(t) for t in texts))
+    backend = get_backend(model)
+    if backend is not None:
+        vecs: List[List[float]] = []
+        for i in range(0, len(texts), max_inputs):
+            vecs.extend(backend.embed(texts[i:i + max_inputs]))
+        return vecs
+
+    batches = pack_batches(texts, max_inputs, max_tokens)
+    metrics.count("embed_api_calls", len(batches))
+    batch_vecs = run_many([aembed_texts([texts[i] for i in b], model=model) for b in batches])
+
+    out: List[List[float]] = [[] for _ in texts]
+    for batch, vecs in zip(batches, batch_vecs):
+        for i, v in zip(batch, vecs):
+            out[i] = v
+    return out
+
+def embed_texts_cached(
+    texts: List[str],
+    model: str,
+    cache: Optional[EmbeddingCache] = None,
+    max_inputs: int = EMBED_MAX_INPUTS,
+    max_tokens: int = EMBED_MAX_TOKENS,
+) -> List[List[float]]:
+    """
+    Batched embedding that serves repeats from `cache` and only sends the
+    (deduped) misses to the API.
+    """
+    if cache is None:
+        return embed_texts_batched(texts, model=model, max_inputs=max_inputs, max_tokens=max_tokens)
+
+    out = cache.get_many(texts, model)
+    miss_idx = [i for i, v in enumerate(out) if v is None]
+    metrics.count("embed_cache_hits", len(texts) - len(miss_idx))
+    metrics.count("embed_cache_misses", len(miss_idx))
+    if miss_idx:
+        uniq = list(dict.fromkeys(texts[i] for i in miss_idx))
+        vecs = embed_texts_batched(uniq, model=model, max_inputs=max_inputs, max_tokens=max_tokens)
+        cache.put_many(uniq, vecs, model)
+        by_text = dict(zip(uniq, vecs))
+        for i in miss_idx:
+            out[i] = by_text[texts[i]]
+    return out
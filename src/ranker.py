@@ -1,11 +1,36 @@
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
+import heapq
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
 
+from . import metrics
 from .config import Settings
-from .text_utils import extract_sections, tokenize_skills, find_years_experience, normalize, extract_jd_relevant_block
-from .openai_utils import embed_texts
-from .bias_utils import scan_and_mask_sensitive, bias_flag
+from .text_utils import (
+    ResumeDocument,
+    extract_sections,
+    tokenize_skills,
+    normalize,
+    extract_jd_relevant_block,
+)
+from .openai_utils import embed_texts_cached
+from .cache import get_embedding_cache, text_hash
+from .scoring import ComponentScores, hybrid_scores, pool_similarities, pool_similarity_matrix
+from .bias_utils import SensitiveSpan, bias_flag, mask_spans
+from .io_utils import chunk_spans
+from .evidence import LineIndex
+from .result_store import CandidateStore, CandidateStoreBuilder
+from .vector_store import QuantizedVectorStore, get_vector_store
+from .skill_index import (
+    JDSkillVector,
+    SkillVocab,
+    hit_columns,
+    jd_skill_vector,
+    matched_missing,
+    skill_matrix,
+    skill_overlap,
+)
 
 @dataclass
 class CandidateResult:
@@ -23,7 +48,140 @@ class CandidateResult:
     bias_score_delta: float
     bias_flagged: bool
 
-def _skill_score(jd_skills: List[str], resume_skills: List[str]) -> Tuple[float, List[str], List[str]]:
+@dataclass
+class RankProgress:
+    """
+    Event from rank_candidates_stream. `results` is only filled on the final (done) event.
+    """
+    processed: int
+    kept: int
+    cutoff_score: float  # lowest score currently in the top-K (0.0 until full)
+    done: bool = False
+    results: List[CandidateResult] = field(default_factory=list)
+
+@dataclass
+class _Scored:
+    """
+    Everything about a scored resume except the expensive display extras
+    (matched / missing names, evidence snippets), which are only built for
+    candidates that are kept.
+    """
+    idx: int
+    filename: str
+    text_n: str  # normalized text, for evidence snippets; not the whole ResumeDocument
+    score: float
+    sim: float
+    sim_masked: float
+    s_skill: float
+    s_exp: float
+    years: float
+    jd_skills: JDSkillVector
+    skill_cols: np.ndarray  # columns of jd_skills.names this resume matched
+    sensitive_found: Dict[str, List[str]]
+    delta: float
+
+    def skill_lists(self) -> Tuple[List[str], List[str]]:
+        return matched_missing(self.jd_skills, self.skill_cols)
+
+@dataclass
+class JDProfile:
+    """
+    One job description, processed once: normalized text, sections, the skill
+    list every stage scores and displays, where that list came from, and the
+    JD embedding (filled on first use by jd_embedding).
+    """
+    text: str
+    normalized: str
+    sections: Dict[str, str]
+    skills: List[str]
+    skill_source: str = "rule"  # "rule" or "llm"
+    embedding: Optional[List[float]] = None
+
+    def with_skills(self, skills: List[str], source: str) -> "JDProfile":
+        """
+        Same JD with a different skill list (e.g. the LLM fallback); shares the embedding.
+        """
+        return replace(self, skills=list(skills), skill_source=source)
+
+@dataclass
+class ScoreMatrix:
+    """
+    Result of rank_matrix: JD x resume component matrices (rows follow `jds`,
+    columns follow `filenames`) plus the top-K ranking for each JD.
+    """
+    jds: List[JDProfile]
+    filenames: List[str]
+    score: np.ndarray        # (n_jds, n_resumes) hybrid score
+    embed: np.ndarray        # (n_jds, n_resumes) JD similarity, original text
+    embed_masked: np.ndarray # (n_jds, n_resumes) JD similarity, sensitive info masked
+    skill: np.ndarray        # (n_jds, n_resumes) skill overlap
+    exp: np.ndarray          # (n_resumes,) experience score (JD independent)
+    delta: np.ndarray        # (n_jds, n_resumes) bias delta (orig - masked)
+    rankings: List[List[CandidateResult]] = field(default_factory=list)
+
+@dataclass
+class Ranking:
+    """
+    A ranked pool plus the component scores behind it, held once as a
+    CandidateStore. `by_row` and `components` rows follow input order;
+    `order` lists by_row rows in rank order, so reweight() can re-score and
+    re-sort in one vectorized pass.
+    """
+    by_row: CandidateStore
+    components: ComponentScores
+    order: Optional[np.ndarray] = None
+
+    def __post_init__(self):
+        if self.order is None:
+            self.order = _rank_order(self.by_row)
+
+    def __len__(self) -> int:
+        return len(self.by_row)
+
+    @property
+    def results(self) -> CandidateStore:
+        """
+        The candidates in rank order.
+        """
+        return self.by_row.take(self.order)
+
+    def reweight(self, settings: Settings) -> CandidateStore:
+        """
+        Apply new weights / bias_delta_flag from `settings` to every candidate
+        and re-sort; nothing is re-parsed or re-embedded.
+        """
+        score, delta, flagged = self.components.combine(settings)
+        self.by_row.score[:] = np.round(score, 4)
+        self.by_row.bias_score_delta[:] = np.round(delta, 4)
+        self.by_row.bias_flagged[:] = flagged
+        self.order = _rank_order(self.by_row)
+        return self.results
+
+def _rank_order(store: CandidateStore) -> np.ndarray:
+    # Rounded score desc; ties keep row order, as in rank_candidates
+    return np.argsort(-store.score, kind="stable")
+
+# A resume can be passed as (filename, raw_text) or as a prepared ResumeDocument
+ResumeInput = Union[Tuple[str, str], ResumeDocument]
+
+# A JD can be passed as raw text or as a prepared JDProfile
+JDInput = Union[str, JDProfile]
+
+# Rule-skill profiles by (JD hash, embedding model); Streamlit reruns reuse them
+_JD_PROFILES: "OrderedDict[Tuple[str, str], JDProfile]" = OrderedDict()
+_JD_PROFILES_MAX = 64
+
+def _as_document(item: ResumeInput) -> ResumeDocument:
+    if isinstance(item, ResumeDocument):
+        return item
+    filename, text = item
+    return ResumeDocument(text, filename=filename)
+
+def _skill_score(
+    jd_skills: List[str], resume_skills: Union[List[str], ResumeDocument]
+) -> Tuple[float, List[str], List[str]]:
+    if isinstance(resume_skills, ResumeDocument):
+        resume_skills = resume_skills.skills
     jd_set = set([s.lower() for s in jd_skills])
     rs_set = set([s.lower() for s in resume_skills])
     if not jd_set:
@@ -34,88 +192,611 @@ def _skill_score(jd_skills: List[str], resume_skills: List[str]) -> Tuple[float,
     score = len(matched) / max(1, len(jd_set))
     return score, matched, missing
 
-def _evidence_snippets(resume_text: str, matched_skills: List[str], max_snips: int = 6) -> List[str]:
+def _evidence_snippets(
+    resume_text: Union[str, ResumeDocument], matched_skills: List[str], max_snips: int = 6
+) -> List[str]:
     """
     Pull line evidence where matched skill keywords appear.
+    A plain string is expected to be normalized already.
+    """
+    index = resume_text.line_index if isinstance(resume_text, ResumeDocument) else LineIndex(resume_text)
+    return index.snippets(matched_skills, max_snips=max_snips)
+
+def _jd_skills(jd_text_n: str, jd_sections: Optional[Dict[str, str]] = None) -> List[str]:
+    if jd_sections is None:
+        jd_sections = extract_sections(jd_text_n)
+    jd_block = jd_sections.get("skills", "") or extract_jd_relevant_block(jd_text_n)
+    return tokenize_skills(jd_block)
+
+def jd_profile(jd_text: str, settings: Settings) -> JDProfile:
+    """
+    Rule-based JDProfile for `jd_text`, built once per JD (keyed by the hash of
+    its normalized text) and reused afterwards.
+    """
+    key = (text_hash(jd_text), settings.embedding_model)
+    profile = _JD_PROFILES.get(key)
+    if profile is not None:
+        _JD_PROFILES.move_to_end(key)
+        return profile
+
+    jd_text_n = normalize(jd_text)
+    sections = extract_sections(jd_text_n)
+    profile = JDProfile(
+        text=jd_text,
+        normalized=jd_text_n,
+        sections=sections,
+        skills=_jd_skills(jd_text_n, sections),
+    )
+    _JD_PROFILES[key] = profile
+    while len(_JD_PROFILES) > _JD_PROFILES_MAX:
+        _JD_PROFILES.popitem(last=False)
+    return profile
+
+def _as_profile(jd: JDInput, settings: Settings) -> JDProfile:
+    return jd if isinstance(jd, JDProfile) else jd_profile(jd, settings)
+
+def _embed(texts: List[str], settings: Settings) -> List[List[float]]:
+    """
+    Cache first, then a handful of packed requests for whatever is left.
+    """
+    return embed_texts_cached(
+        texts,
+        model=settings.embedding_model,
+        cache=get_embedding_cache(settings),
+        max_inputs=settings.embed_batch_max_inputs,
+        max_tokens=settings.embed_batch_max_tokens,
+    )
+
+def jd_embedding(profile: JDProfile, settings: Settings) -> List[float]:
+    """
+    The profile's JD vector, embedded on first use and kept on the profile.
+    """
+    if profile.embedding is None:
+        profile.embedding = _embed([profile.normalized], settings)[0]
+    return profile.embedding
+
+def _pool(vecs: List[List[float]], weights: List[int]) -> List[float]:
+    """
+    Length-weighted mean of chunk vectors (a single chunk is returned as-is).
+    """
+    if len(vecs) == 1:
+        return vecs[0]
+    return np.average(np.asarray(vecs, dtype=np.float64), axis=0, weights=np.maximum(weights, 1)).tolist()
+
+def _embed_resumes(docs: List[ResumeDocument], settings: Settings) -> Tuple[List[List[float]], List[List[float]]]:
+    """
+    Original + masked document vectors for each resume.
+    Each resume is embedded as section/size-bounded chunks pooled into one
+    vector. For the masked vector only chunks containing a redaction are
+    embedded again; resumes with no sensitive hits reuse the original vector.
+    """
+    texts: List[str] = []
+    plans = []
+    for doc in docs:
+        text_n, scan = doc.normalized, doc.bias_scan
+        spans = chunk_spans(text_n, settings.embed_chunk_chars) or [(0, len(text_n))]
+        orig_ids = []
+        for start, end in spans:
+            orig_ids.append(len(texts))
+            texts.append(text_n[start:end])
+
+        masked_ids = None
+        if scan.spans:
+            masked_ids = []
+            for (start, end), oid in zip(spans, orig_ids):
+                local = [
+                    SensitiveSpan(sp.label, max(sp.start, start) - start, min(sp.end, end) - start, sp.text)
+                    for sp in scan.spans
+                    if sp.start < end and sp.end > start
+                ]
+                if local:
+                    masked_ids.append(len(texts))
+                    texts.append(mask_spans(text_n[start:end], local))
+                else:
+                    masked_ids.append(oid)
+        plans.append((spans, orig_ids, masked_ids))
+
+    vecs = _embed(texts, settings)
+
+    orig_vecs: List[List[float]] = []
+    masked_vecs: List[List[float]] = []
+    for spans, orig_ids, masked_ids in plans:
+        # Both variants use the original span lengths, so masking can't shift chunk weights
+        weights = [e - s for s, e in spans]
+        orig = _pool([vecs[i] for i in orig_ids], weights)
+        orig_vecs.append(orig)
+        if masked_ids is None:
+            masked_vecs.append(orig)
+        else:
+            masked_vecs.append(_pool([vecs[i] for i in masked_ids], weights))
+    return orig_vecs, masked_vecs
+
+def _score_batch(
+    jd_vec: List[float],
+    jd_skills: List[str],
+    batch: List[ResumeInput],
+    settings: Settings,
+    start_idx: int = 1,
+) -> List[_Scored]:
     """
-    lines = [ln.strip() for ln in normalize(resume_text).splitlines() if ln.strip()]
-    snips: List[str] = []
+    Normalize, bias-scan, embed and score a batch of resumes. Each resume is
+    wrapped in a ResumeDocument, so its text is normalized and split only once.
+    """
+    docs = [_as_document(item) for item in batch]
+
+    # Embed every resume (chunked; masked variant only where redactions landed)
+    orig_vecs, masked_vecs = _embed_resumes(docs, settings)
+
+    # Score: one stacked matrix, one matrix-vector product for every similarity
+    sim_all, sim_masked_all = pool_similarities(jd_vec, orig_vecs, masked_vecs)
+
+    # Skills overlap: one sparse product for the whole batch, columns = this JD's skills
+    vocab = SkillVocab()
+    jd_sk = jd_skill_vector(jd_skills, vocab)
+    rows = [vocab.lookup(doc.skills) for doc in docs]
+    s_skill_all, hits = skill_overlap(skill_matrix(rows, len(vocab)), jd_sk)
+
+    # Experience heuristic
+    years_all = np.array([doc.years_experience for doc in docs], dtype=np.float64)
+    s_exp_all = np.minimum(years_all / 8.0, 1.0)  # cap at 8 years
+
+    score_all, delta_all = hybrid_scores(sim_all, sim_masked_all, s_skill_all, s_exp_all, settings)
+
+    return [
+        _Scored(
+            idx=start_idx + i,
+            filename=doc.filename,
+            text_n=doc.normalized,
+            score=float(score_all[i]),
+            sim=float(sim_all[i]),
+            sim_masked=float(sim_masked_all[i]),
+            s_skill=float(s_skill_all[i]),
+            s_exp=float(s_exp_all[i]),
+            years=doc.years_experience,
+            jd_skills=jd_sk,
+            skill_cols=hit_columns(hits, i),
+            sensitive_found=doc.bias_scan.found,
+            delta=float(delta_all[i]),
+        )
+        for i, doc in enumerate(docs)
+    ]
 
-    for skill in matched_skills:
-        sk = skill.lower()
-        for ln in lines:
-            if sk in ln.lower():
-                snips.append(ln)
-                if len(snips) >= max_snips:
-                    return snips
+def _to_result(s: _Scored, settings: Settings) -> CandidateResult:
+    matched, missing = s.skill_lists()
+    return CandidateResult(
+        candidate_id=f"C{s.idx:03d}",
+        filename=s.filename,
+        score=round(s.score, 4),
+        score_embed=round(s.sim, 4),
+        score_skill=round(s.s_skill, 4),
+        score_exp=round(s.s_exp, 4),
+        years_exp_guess=s.years,
+        matched_skills=matched,
+        missing_skills=missing,
+        evidence_snippets=_evidence_snippets(s.text_n, matched),
+        bias_sensitive_found=s.sensitive_found,
+        bias_score_delta=round(s.delta, 4),
+        bias_flagged=bias_flag(s.delta, settings.bias_delta_flag),
+    )
+
+def _append_scored(builder: CandidateStoreBuilder, s: _Scored, settings: Settings) -> None:
+    """
+    _to_result, written straight into store columns.
+    """
+    matched, missing = s.skill_lists()
+    builder.append(
+        seq=s.idx,
+        filename=s.filename,
+        score=round(s.score, 4),
+        score_embed=round(s.sim, 4),
+        score_skill=round(s.s_skill, 4),
+        score_exp=round(s.s_exp, 4),
+        years_exp_guess=s.years,
+        bias_score_delta=round(s.delta, 4),
+        bias_flagged=bias_flag(s.delta, settings.bias_delta_flag),
+        matched_skills=matched,
+        missing_skills=missing,
+        evidence_snippets=_evidence_snippets(s.text_n, matched),
+        bias_sensitive_found=s.sensitive_found,
+    )
+
+def _to_store(scored: List[_Scored], settings: Settings, pools_from: Optional[CandidateStore] = None) -> CandidateStore:
+    builder = CandidateStoreBuilder(pools_from)
+    for s in scored:
+        _append_scored(builder, s, settings)
+    return builder.build()
+
+def _components(scored: List[_Scored]) -> np.ndarray:
+    """
+    (n, 4) sim, sim_masked, skill, exp rows.
+    """
+    return np.array([(s.sim, s.sim_masked, s.s_skill, s.s_exp) for s in scored], dtype=np.float64).reshape(-1, 4)
 
-    return snips[:max_snips]
+def _component_scores(comps: np.ndarray) -> ComponentScores:
+    return ComponentScores(comps[:, 0], comps[:, 1], comps[:, 2], comps[:, 3])
+
+def _score_pool(jd_text: JDInput, resumes: List[ResumeInput], settings: Settings) -> List[_Scored]:
+    profile = _as_profile(jd_text, settings)
+    resumes = list(resumes)
+    metrics.count("resumes_ranked", len(resumes))
+    if not resumes:
+        return []
+    jd_vec = jd_embedding(profile, settings)
+    return _score_batch(jd_vec, profile.skills, resumes, settings)
 
 def rank_candidates(
-    jd_text: str,
-    resumes: List[Tuple[str, str]],  # (filename, raw_text)
+    jd_text: JDInput,  # raw JD text or a prepared JDProfile
+    resumes: List[ResumeInput],  # (filename, raw_text) or ResumeDocument
     settings: Settings
 ) -> List[CandidateResult]:
 
-    jd_text_n = normalize(jd_text)
-    jd_sections = extract_sections(jd_text_n)
-    jd_block = jd_sections.get("skills", "") or extract_jd_relevant_block(jd_text_n)
-    jd_skills = tokenize_skills(jd_block)
+    with metrics.span("rank_candidates"):
+        results = [_to_result(s, settings) for s in _score_pool(jd_text, resumes, settings)]
+        return sorted(results, key=lambda x: x.score, reverse=True)
+
+def build_ranking(
+    jd_text: JDInput,
+    resumes: List[ResumeInput],
+    settings: Settings,
+) -> Ranking:
+    """
+    rank_candidates into a CandidateStore, keeping the per-candidate
+    component scores so the ranking can be re-weighted later
+    (Ranking.reweight). No CandidateResult objects are built.
+    """
+    with metrics.span("rank_candidates"):
+        scored = _score_pool(jd_text, resumes, settings)
+        return Ranking(by_row=_to_store(scored, settings), components=_component_scores(_components(scored)))
+
+def _jd_embeddings(profiles: List[JDProfile], settings: Settings) -> List[List[float]]:
+    """
+    Vectors for several profiles, embedding the missing ones in one packed call.
+    """
+    todo = [p for p in profiles if p.embedding is None]
+    if todo:
+        for p, vec in zip(todo, _embed([p.normalized for p in todo], settings)):
+            p.embedding = vec
+    return [p.embedding for p in profiles]
+
+def _store_similarities(
+    jd_vecs: List[List[float]],
+    docs: List[ResumeDocument],
+    settings: Settings,
+    store: QuantizedVectorStore,
+    chunk_size: int = 256,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    JD x resume similarity (original, masked) from the vector store. Resumes
+    are keyed by content (+ chunk size); only ones the store lacks are
+    embedded, `chunk_size` at a time, so full-precision lists never pile up.
+    """
+    keys = [f"{text_hash(doc.normalized)}:{settings.embed_chunk_chars}" for doc in docs]
+    masked_keys = [k + ":masked" if doc.bias_scan.spans else k for k, doc in zip(keys, docs)]
+    todo = [i for i, (k, mk) in enumerate(zip(keys, masked_keys)) if k not in store or mk not in store]
+    for start in range(0, len(todo), chunk_size):
+        part = todo[start:start + chunk_size]
+        orig, masked = _embed_resumes([docs[i] for i in part], settings)
+        store.add([keys[i] for i in part] + [masked_keys[i] for i in part], orig + masked)
+    store.flush()
+    return store.similarities(jd_vecs, keys), store.similarities(jd_vecs, masked_keys)
+
+def rank_matrix(
+    jds: List[JDInput],
+    resumes: List[ResumeInput],
+    settings: Settings,
+    top_k: Optional[int] = 50,
+) -> ScoreMatrix:
+    """
+    Score a shared resume pool against many JDs at once. Each resume is
+    prepared and embedded once, each JD once; the JD x resume component
+    matrices come from two dense products (original + masked similarity)
+    and one sparse product (skill overlap). `rankings[j]` is JD j's top
+    `top_k` (all resumes if None), ordered like rank_candidates.
+    With Settings.vector_store_dir set, resume vectors go to a quantized
+    memory-mapped store (reused across calls) and similarities are computed
+    on the mapped arrays. Raises ValueError if `top_k` < 1.
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    profiles = [_as_profile(jd, settings) for jd in jds]
+    docs = [_as_document(item) for item in resumes]
+    n = len(docs)
 
+    years = np.array([doc.years_experience for doc in docs], dtype=np.float64)
+    exp = np.minimum(years / 8.0, 1.0)  # cap at 8 years
+    if not profiles:
+        # No JDs: nothing to embed the pool for
+        empty = np.zeros((0, n))
+        return ScoreMatrix(
+            jds=[],
+            filenames=[doc.filename for doc in docs],
+            score=empty,
+            embed=empty,
+            embed_masked=empty,
+            skill=empty,
+            exp=exp,
+            delta=empty,
+        )
 
-    # Embed JD once
-    jd_vec = embed_texts([jd_text_n], model=settings.embedding_model)[0]
+    jd_vecs = _jd_embeddings(profiles, settings) if n else [[] for _ in profiles]
+    store = get_vector_store(settings, len(jd_vecs[0])) if n else None
+    if store is None:
+        orig_vecs, masked_vecs = _embed_resumes(docs, settings) if n else ([], [])
+        sim, sim_masked = pool_similarity_matrix(jd_vecs, orig_vecs, masked_vecs)
+    else:
+        sim, sim_masked = _store_similarities(jd_vecs, docs, settings, store)
 
-    results: List[CandidateResult] = []
+    # Skills: JD-side (n_jds, V) and resume-side (n, V) binary matrices over
+    # the union of the JDs' skills, one product
+    vocab = SkillVocab()
+    jd_sks = [jd_skill_vector(p.skills, vocab) for p in profiles]
+    resume_rows = [vocab.lookup(doc.skills) for doc in docs]
+    resume_m = skill_matrix(resume_rows, len(vocab))
+    jd_m = skill_matrix([sk.cols for sk in jd_sks], len(vocab))
+    counts = (jd_m @ resume_m.T).toarray().astype(np.float64)
+    jd_sizes = np.array([max(1, len(sk.names)) for sk in jd_sks], dtype=np.float64)
+    skill = counts / jd_sizes[:, None]
 
-    for idx, (filename, r_text) in enumerate(resumes, start=1):
-        r_text_n = normalize(r_text)
+    score, delta = hybrid_scores(sim, sim_masked, skill, exp, settings)
+    out = ScoreMatrix(
+        jds=profiles,
+        filenames=[doc.filename for doc in docs],
+        score=score,
+        embed=sim,
+        embed_masked=sim_masked,
+        skill=skill,
+        exp=exp,
+        delta=delta,
+    )
 
-        # Bias scan + masked text
-        scan = scan_and_mask_sensitive(r_text_n)
+    k = n if top_k is None else min(top_k, n)
+    for j, jd_sk in enumerate(jd_sks):
+        # Same order as rank_candidates: rounded score desc, ties by position
+        order = np.argsort(-np.round(score[j], 4), kind="stable")[:k]
+        out.rankings.append([
+            _to_result(
+                _Scored(
+                    idx=i + 1,
+                    filename=docs[i].filename,
+                    text_n=docs[i].normalized,
+                    score=float(score[j, i]),
+                    sim=float(sim[j, i]),
+                    sim_masked=float(sim_masked[j, i]),
+                    s_skill=float(skill[j, i]),
+                    s_exp=float(exp[i]),
+                    years=float(years[i]),
+                    jd_skills=jd_sk,
+                    skill_cols=np.flatnonzero(np.isin(jd_sk.cols, resume_rows[i])),
+                    sensitive_found=docs[i].bias_scan.found,
+                    delta=float(delta[j, i]),
+                ),
+                settings,
+            )
+            for i in order.tolist()
+        ])
+    return out
 
-        # Embed resume (original + masked)
-        r_vec = embed_texts([r_text_n], model=settings.embedding_model)[0]
-        r_vec_masked = embed_texts([scan.masked_text], model=settings.embedding_model)[0]
+# Fields that only affect how scores are combined, not what gets parsed / embedded
+_WEIGHT_FIELDS = ("w_embed", "w_skill", "w_exp", "bias_delta_flag")
 
-        sim = float(cosine_similarity([jd_vec], [r_vec])[0][0])
-        sim_masked = float(cosine_similarity([jd_vec], [r_vec_masked])[0][0])
+def session_key(jd_text: JDInput, settings: Settings) -> Tuple[str, Settings]:
+    """
+    Identity of a RankingSession: the JD plus every setting except the
+    weights / bias threshold (those can change inside a session).
+    """
+    text = jd_text.text if isinstance(jd_text, JDProfile) else jd_text
+    return text_hash(text), replace(settings, **{f: 0.0 for f in _WEIGHT_FIELDS})
 
-        # Skills overlap
-        r_sections = extract_sections(r_text_n)
-        r_skills = tokenize_skills(r_sections.get("skills", "") or r_text_n)
-        s_skill, matched, missing = _skill_score(jd_skills, r_skills)
+# RankingSession repacks its string pools once more than this share of entries is unused
+_POOL_MAX_DEAD = 0.5
 
-        # Experience heuristic
-        years = find_years_experience(r_text_n)
-        s_exp = min(years / 8.0, 1.0)  # cap at 8 years
+class RankingSession:
+    """
+    A ranking for one (JD, settings) pair that grows and shrinks in place.
+    Resumes are keyed by filename: adding only scores files that are new or
+    whose content fingerprint changed, and splices them into the store.
+    Candidate IDs are assigned once per filename and never reused.
+    """
+    def __init__(self, jd_text: JDInput, settings: Settings):
+        self.settings = settings
+        self.profile = _as_profile(jd_text, settings)
+        self.key = session_key(self.profile, settings)
+        self._fingerprints: Dict[str, str] = {}  # filename -> content fingerprint
+        self._seqs: Dict[str, int] = {}  # filename -> stable candidate number (C{seq:03d})
+        self._next_seq = 1
+        self._comps = _components([])  # rows follow ranking.by_row (seq order)
+        self.ranking = Ranking(by_row=_to_store([], settings), components=_component_scores(self._comps))
 
-        # Weighted score
-        score = settings.w_embed * sim + settings.w_skill * s_skill + settings.w_exp * s_exp
-        score_masked = settings.w_embed * sim_masked + settings.w_skill * s_skill + settings.w_exp * s_exp
-        delta = score - score_masked
+    def __len__(self) -> int:
+        return len(self._fingerprints)
 
-        flagged = bias_flag(delta, settings.bias_delta_flag)
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._fingerprints
 
-        evidence = _evidence_snippets(r_text_n, matched)
+    @property
+    def results(self) -> CandidateStore:
+        return self.ranking.results
 
-        results.append(
-            CandidateResult(
-                candidate_id=f"C{idx:03d}",
-                filename=filename,
-                score=round(score, 4),
-                score_embed=round(sim, 4),
-                score_skill=round(s_skill, 4),
-                score_exp=round(s_exp, 4),
-                years_exp_guess=years,
-                matched_skills=matched,
-                missing_skills=missing,
-                evidence_snippets=evidence,
-                bias_sensitive_found=scan.found,
-                bias_score_delta=round(delta, 4),
-                bias_flagged=flagged,
-            )
+    def fingerprint(self, filename: str) -> Optional[str]:
+        return self._fingerprints.get(filename)
+
+    def _keep(self, mask: np.ndarray, extra: Optional[CandidateStore] = None, extra_comps: Optional[np.ndarray] = None) -> None:
+        """
+        Keep by_row rows where `mask` holds, append `extra`, and re-rank (rows stay in seq order).
+        """
+        rows = np.flatnonzero(mask)
+        store = self.ranking.by_row.take(rows)
+        comps = self._comps[rows]
+        if extra is not None:
+            store = CandidateStore.concat([store, extra])
+            comps = np.concatenate([comps, extra_comps])
+            by_seq = np.argsort(store.seq, kind="stable")
+            store, comps = store.take(by_seq), comps[by_seq]
+        self._comps = comps
+        # Removed / replaced rows leave their strings behind in the shared pools
+        store = store.compacted(max_dead=_POOL_MAX_DEAD)
+        self.ranking = Ranking(by_row=store, components=_component_scores(comps))
+
+    def add(self, resumes: List[ResumeInput], fingerprints: Optional[List[str]] = None) -> CandidateStore:
+        """
+        Score new / changed resumes and merge them in. `fingerprints` (e.g. a
+        hash of the uploaded bytes) default to the hash of the resume text.
+        Returns the rows that were (re)computed.
+        """
+        docs = [_as_document(item) for item in resumes]
+        if fingerprints is None:
+            fingerprints = [text_hash(doc.raw) for doc in docs]
+
+        todo: Dict[str, Tuple[ResumeDocument, str]] = {}
+        for doc, fp in zip(docs, fingerprints):
+            if self.fingerprint(doc.filename) != fp:
+                todo[doc.filename] = (doc, fp)  # a repeated filename: last one wins
+        if not todo:
+            return _to_store([], self.settings, pools_from=self.ranking.by_row)
+
+        with metrics.span("rank_candidates"):
+            metrics.count("resumes_ranked", len(todo))
+            jd_vec = jd_embedding(self.profile, self.settings)
+            batch = [doc for doc, _ in todo.values()]
+            scored = _score_batch(jd_vec, self.profile.skills, batch, self.settings)
+
+        replaced = [self._seqs[name] for name in todo if name in self._seqs]
+        for s, (doc, fp) in zip(scored, todo.values()):
+            if doc.filename not in self._seqs:
+                self._seqs[doc.filename] = self._next_seq
+                self._next_seq += 1
+            s.idx = self._seqs[doc.filename]
+            self._fingerprints[doc.filename] = fp
+
+        fresh = _to_store(scored, self.settings, pools_from=self.ranking.by_row)
+        self._keep(~np.isin(self.ranking.by_row.seq, replaced), fresh, _components(scored))
+        return fresh
+
+    def remove(self, filenames: Iterable[str]) -> int:
+        """
+        Drop resumes by filename (their IDs are retired); returns how many were removed.
+        """
+        gone = []
+        for name in filenames:
+            if self._fingerprints.pop(name, None) is not None:
+                gone.append(self._seqs.pop(name))
+        if gone:
+            self._keep(~np.isin(self.ranking.by_row.seq, gone))
+        return len(gone)
+
+    def sync(self, resumes: List[ResumeInput], fingerprints: Optional[List[str]] = None) -> CandidateStore:
+        """
+        Make the session hold exactly `resumes`: add new / changed ones and
+        remove filenames that are no longer present. Returns the full ranking.
+        """
+        docs = [_as_document(item) for item in resumes]
+        present = {doc.filename for doc in docs}
+        self.remove([name for name in self._fingerprints if name not in present])
+        self.add(docs, fingerprints)
+        return self.results
+
+    def reweight(self, settings: Settings) -> CandidateStore:
+        """
+        Adopt new weights / bias threshold; later additions are scored with them too.
+        """
+        self.settings = replace(self.settings, **{f: getattr(settings, f) for f in _WEIGHT_FIELDS})
+        return self.ranking.reweight(self.settings)
+
+def rank_candidates_columnar(
+    jd_text: JDInput,
+    resumes: Iterable[ResumeInput],  # read lazily, `chunk_size` at a time
+    settings: Settings,
+    chunk_size: int = 256,
+) -> CandidateStore:
+    """
+    Rank a very large pool straight into a CandidateStore: each chunk is
+    scored and appended to compact columns, so no CandidateResult (or its
+    ResumeDocument) outlives its chunk. Same scores, IDs and order as
+    rank_candidates. Raises ValueError if `chunk_size` < 1.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    profile = _as_profile(jd_text, settings)
+    builder = CandidateStoreBuilder()
+    it = iter(resumes)
+    processed = 0
+    with metrics.span("rank_candidates"):
+        while True:
+            batch = list(islice(it, chunk_size))
+            if not batch:
+                break
+            jd_vec = jd_embedding(profile, settings)
+            for s in _score_batch(jd_vec, profile.skills, batch, settings, start_idx=processed + 1):
+                _append_scored(builder, s, settings)
+            processed += len(batch)
+        metrics.count("resumes_ranked", processed)
+    return builder.build().sorted()
+
+def rank_candidates_stream(
+    jd_text: JDInput,
+    resumes: Iterable[ResumeInput],  # (filename, raw_text) or ResumeDocument, read lazily
+    settings: Settings,
+    top_k: int = 200,
+    chunk_size: int = 256,
+) -> Iterator[RankProgress]:
+    """
+    Rank an arbitrarily large resume stream while holding only the best `top_k`.
+    Resumes are consumed `chunk_size` at a time (one embedding round per chunk)
+    and a RankProgress event is yielded after each chunk. Evidence snippets are
+    built only for the final top-K. The final event has done=True and `results`
+    in the same order rank_candidates would give for those candidates.
+    Raises ValueError if `top_k` or `chunk_size` is < 1.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    profile = _as_profile(jd_text, settings)
+    jd_skills = profile.skills
+    jd_vec = jd_embedding(profile, settings)
+
+    # Min-heap on (rounded score, -position): the root is the weakest kept candidate
+    heap: List[Tuple[float, int, _Scored]] = []
+    it = iter(resumes)
+    processed = 0
+
+    while True:
+        batch = list(islice(it, chunk_size))
+        if not batch:
+            break
+        for s in _score_batch(jd_vec, jd_skills, batch, settings, start_idx=processed + 1):
+            entry = (round(s.score, 4), -s.idx, s)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        processed += len(batch)
+        yield RankProgress(
+            processed=processed,
+            kept=len(heap),
+            cutoff_score=heap[0][0] if len(heap) >= top_k else 0.0,
         )
 
-    results.sort(key=lambda x: x.score, reverse=True)
-    return results
+    kept = sorted(heap, key=lambda e: (-e[0], e[2].idx))
+    yield RankProgress(
+        processed=processed,
+        kept=len(kept),
+        cutoff_score=kept[-1][0] if len(kept) >= top_k else 0.0,
+        done=True,
+        results=[_to_result(e[2], settings) for e in kept],
+    )
+
+def rank_top_k(
+    jd_text: JDInput,
+    resumes: Iterable[ResumeInput],
+    settings: Settings,
+    top_k: int = 200,
+    chunk_size: int = 256,
+) -> List[CandidateResult]:
+    """
+    Convenience wrapper: drain rank_candidates_stream and return the final top-K.
+    """
+    final: Optional[RankProgress] = None
+    for event in rank_candidates_stream(jd_text, resumes, settings, top_k=top_k, chunk_size=chunk_size):
+        final = event
+    return final.results if final else []
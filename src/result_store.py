@@ -0,0 +1,422 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Column names of the ranked-candidates table (app + agentic pipeline + CSV export)
+FRAME_COLUMNS = (
+    "Candidate",
+    "Resume File",
+    "Overall Score",
+    "Embed Similarity",
+    "Skill Match",
+    "Exp Score",
+    "Years Exp (guess)",
+    "Bias Flagged",
+    "Bias Δ (orig - masked)",
+    "Sensitive Detected",
+)
+
+_NUMERIC = ("score", "score_embed", "score_skill", "score_exp", "years_exp_guess", "bias_score_delta")
+
+class StringPool:
+    """
+    Interned strings: each distinct value is stored once and referred to by an int32 code.
+    """
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value: str) -> int:
+        c = self._codes.get(value)
+        if c is None:
+            c = len(self.values)
+            self._codes[value] = c
+            self.values.append(value)
+        return c
+
+def _repack(pool: StringPool, codes: Sequence[np.ndarray], max_dead: float):
+    """
+    (new pool, old code -> new code map) keeping only the values in `codes`,
+    or None when at most `max_dead` of the pool's entries are unused.
+    """
+    used = np.unique(np.concatenate(codes)) if codes else np.zeros(0, dtype=np.int32)
+    if len(pool) - len(used) <= max_dead * len(pool):
+        return None
+    packed = StringPool()
+    remap = np.full(len(pool), -1, dtype=np.int32)
+    for old in used.tolist():
+        remap[old] = packed.code(pool.values[old])
+    return packed, remap
+
+class Ragged:
+    """
+    Offset-encoded list-of-lists column: row i is codes[offsets[i]:offsets[i + 1]].
+    """
+    __slots__ = ("offsets", "codes")
+
+    def __init__(self, offsets: np.ndarray, codes: np.ndarray):
+        self.offsets = offsets
+        self.codes = codes
+
+    def row(self, i: int) -> np.ndarray:
+        return self.codes[self.offsets[i]:self.offsets[i + 1]]
+
+    def take(self, order: np.ndarray) -> "Ragged":
+        lengths = np.diff(self.offsets)[order]
+        offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if len(self.codes):
+            starts = self.offsets[:-1][order]
+            idx = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+            codes = self.codes[idx]
+        else:
+            codes = self.codes
+        return Ragged(offsets, codes)
+
+    @staticmethod
+    def concat(parts: Sequence["Ragged"]) -> "Ragged":
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for part in parts:
+            offsets.append(part.offsets[1:] + base)
+            base += len(part.codes)
+        codes = np.concatenate([part.codes for part in parts]) if parts else np.zeros(0, dtype=np.int32)
+        return Ragged(np.concatenate(offsets), codes)
+
+def _frombuffer(buf: array, dtype) -> np.ndarray:
+    """
+    Zero-copy NumPy view of an array.array buffer (np.frombuffer rejects empty buffers on some versions).
+    """
+    return np.frombuffer(buf, dtype=dtype) if len(buf) else np.zeros(0, dtype=dtype)
+
+class _RaggedBuilder:
+    def __init__(self):
+        self.offsets = array("q", [0])
+        self.codes = array("i")
+
+    def append(self, codes: Iterable[int]) -> None:
+        self.codes.extend(codes)
+        self.offsets.append(len(self.codes))
+
+    def build(self) -> Ragged:
+        return Ragged(_frombuffer(self.offsets, np.int64), _frombuffer(self.codes, np.int32))
+
+class CandidateView:
+    """
+    Read-only row of a CandidateStore with the same attributes as
+    CandidateResult (lists / dicts are decoded on access).
+    """
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: "CandidateStore", i: int):
+        self._store = store
+        self._i = i
+
+    def _strings(self, col: Ragged) -> List[str]:
+        values = self._store.strings.values
+        return [values[c] for c in col.row(self._i).tolist()]
+
+    @property
+    def candidate_id(self) -> str:
+        return self._store.candidate_ids[self._i]
+
+    @property
+    def filename(self) -> str:
+        return self._store.filenames.values[self._store.filename[self._i]]
+
+    @property
+    def score(self) -> float:
+        return float(self._store.score[self._i])
+
+    @property
+    def score_embed(self) -> float:
+        return float(self._store.score_embed[self._i])
+
+    @property
+    def score_skill(self) -> float:
+        return float(self._store.score_skill[self._i])
+
+    @property
+    def score_exp(self) -> float:
+        return float(self._store.score_exp[self._i])
+
+    @property
+    def years_exp_guess(self) -> float:
+        return float(self._store.years_exp_guess[self._i])
+
+    @property
+    def bias_score_delta(self) -> float:
+        return float(self._store.bias_score_delta[self._i])
+
+    @property
+    def bias_flagged(self) -> bool:
+        return bool(self._store.bias_flagged[self._i])
+
+    @property
+    def matched_skills(self) -> List[str]:
+        return self._strings(self._store.matched)
+
+    @property
+    def missing_skills(self) -> List[str]:
+        return self._strings(self._store.missing)
+
+    @property
+    def evidence_snippets(self) -> List[str]:
+        return self._strings(self._store.snippets)
+
+    @property
+    def bias_sensitive_found(self) -> Dict[str, List[str]]:
+        values = self._store.strings.values
+        found: Dict[str, List[str]] = {}
+        labels = self._store.sensitive_labels.row(self._i).tolist()
+        hits = self._store.sensitive_hits.row(self._i).tolist()
+        for label, hit in zip(labels, hits):
+            found.setdefault(values[label], []).append(values[hit])
+        return found
+
+    def __repr__(self) -> str:
+        return f"CandidateView({self.candidate_id!r}, {self.filename!r}, score={self.score})"
+
+class CandidateStore:
+    """
+    Columnar ranked results: float64 / bool NumPy arrays for the numeric
+    fields, interned filenames, and offset-encoded list columns of interned
+    strings for skills, snippets and sensitive hits. to_frame() shares the
+    numeric arrays with the DataFrame and view(i) / by_id() give a
+    CandidateResult-like row for drill-down.
+    """
+    def __init__(
+        self,
+        strings: StringPool,
+        filenames: StringPool,
+        seq: np.ndarray,
+        filename: np.ndarray,
+        numeric: Dict[str, np.ndarray],
+        bias_flagged: np.ndarray,
+        matched: Ragged,
+        missing: Ragged,
+        snippets: Ragged,
+        sensitive_labels: Ragged,
+        sensitive_hits: Ragged,
+    ):
+        self.strings = strings  # skills, snippets, sensitive labels / hits
+        self.filenames = filenames
+        self.seq = seq  # candidate number: candidate_id is C{seq:03d}
+        self.filename = filename
+        self.score = numeric["score"]
+        self.score_embed = numeric["score_embed"]
+        self.score_skill = numeric["score_skill"]
+        self.score_exp = numeric["score_exp"]
+        self.years_exp_guess = numeric["years_exp_guess"]
+        self.bias_score_delta = numeric["bias_score_delta"]
+        self.bias_flagged = bias_flagged
+        self.matched = matched
+        self.missing = missing
+        self.snippets = snippets
+        self.sensitive_labels = sensitive_labels
+        self.sensitive_hits = sensitive_hits
+        self._ids: Optional[List[str]] = None
+        self._by_id: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def __iter__(self) -> Iterator[CandidateView]:
+        return (CandidateView(self, i) for i in range(len(self)))
+
+    def view(self, i: int) -> CandidateView:
+        return CandidateView(self, i)
+
+    @property
+    def candidate_ids(self) -> List[str]:
+        if self._ids is None:
+            self._ids = [f"C{s:03d}" for s in self.seq.tolist()]
+        return self._ids
+
+    def by_id(self, candidate_id: str) -> CandidateView:
+        if self._by_id is None:
+            self._by_id = {cid: i for i, cid in enumerate(self.candidate_ids)}
+        return CandidateView(self, self._by_id[candidate_id])
+
+    def take(self, order: Sequence[int]) -> "CandidateStore":
+        """
+        Rows reordered / subset by `order` (same string pools).
+        """
+        order = np.asarray(order, dtype=np.int64)
+        return CandidateStore(
+            strings=self.strings,
+            filenames=self.filenames,
+            seq=self.seq[order],
+            filename=self.filename[order],
+            numeric={name: getattr(self, name)[order] for name in _NUMERIC},
+            bias_flagged=self.bias_flagged[order],
+            matched=self.matched.take(order),
+            missing=self.missing.take(order),
+            snippets=self.snippets.take(order),
+            sensitive_labels=self.sensitive_labels.take(order),
+            sensitive_hits=self.sensitive_hits.take(order),
+        )
+
+    @classmethod
+    def concat(cls, stores: Sequence["CandidateStore"]) -> "CandidateStore":
+        """
+        Rows of `stores` one after another; they must share their string pools
+        (see CandidateStoreBuilder(pools_from=...)).
+        """
+        first = stores[0]
+        if any(s.strings is not first.strings or s.filenames is not first.filenames for s in stores):
+            raise ValueError("CandidateStore.concat needs stores that share their string pools")
+        return cls(
+            strings=first.strings,
+            filenames=first.filenames,
+            seq=np.concatenate([s.seq for s in stores]),
+            filename=np.concatenate([s.filename for s in stores]),
+            numeric={name: np.concatenate([getattr(s, name) for s in stores]) for name in _NUMERIC},
+            bias_flagged=np.concatenate([s.bias_flagged for s in stores]),
+            matched=Ragged.concat([s.matched for s in stores]),
+            missing=Ragged.concat([s.missing for s in stores]),
+            snippets=Ragged.concat([s.snippets for s in stores]),
+            sensitive_labels=Ragged.concat([s.sensitive_labels for s in stores]),
+            sensitive_hits=Ragged.concat([s.sensitive_hits for s in stores]),
+        )
+
+    def compacted(self, max_dead: float = 0.0) -> "CandidateStore":
+        """
+        Same rows with string pools cut down to the values they still use.
+        A pool is only rebuilt once more than `max_dead` of its entries are
+        unused; returns self when neither pool needs it.
+        """
+        lists = (self.matched, self.missing, self.snippets, self.sensitive_labels, self.sensitive_hits)
+        strings = _repack(self.strings, [col.codes for col in lists], max_dead)
+        filenames = _repack(self.filenames, [self.filename], max_dead)
+        if strings is None and filenames is None:
+            return self
+        if strings is not None:
+            pool, remap = strings
+            lists = tuple(Ragged(col.offsets, remap[col.codes]) for col in lists)
+        return CandidateStore(
+            strings=self.strings if strings is None else strings[0],
+            filenames=self.filenames if filenames is None else filenames[0],
+            seq=self.seq,
+            filename=self.filename if filenames is None else filenames[1][self.filename],
+            numeric={name: getattr(self, name) for name in _NUMERIC},
+            bias_flagged=self.bias_flagged,
+            matched=lists[0],
+            missing=lists[1],
+            snippets=lists[2],
+            sensitive_labels=lists[3],
+            sensitive_hits=lists[4],
+        )
+
+    def sorted(self) -> "CandidateStore":
+        """
+        Rank order: score descending, ties by candidate number.
+        """
+        return self.take(np.lexsort((self.seq, -self.score)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Ranked-candidates table. Numeric columns wrap the store's arrays
+        without copying; string columns are categoricals over the interned codes.
+        """
+        labels = self.sensitive_labels
+        values = self.strings.values
+        detected = StringPool()
+        detected_codes = np.fromiter(
+            (
+                detected.code(", ".join(dict.fromkeys(values[c] for c in labels.row(i).tolist())))
+                for i in range(len(self))
+            ),
+            dtype=np.int32,
+            count=len(self),
+        )
+        cols = {
+            "Candidate": self.candidate_ids,
+            "Resume File": pd.Categorical.from_codes(self.filename, categories=pd.Index(self.filenames.values, dtype=object)),
+            "Overall Score": self.score,
+            "Embed Similarity": self.score_embed,
+            "Skill Match": self.score_skill,
+            "Exp Score": self.score_exp,
+            "Years Exp (guess)": self.years_exp_guess,
+            "Bias Flagged": self.bias_flagged,
+            "Bias Δ (orig - masked)": self.bias_score_delta,
+            "Sensitive Detected": pd.Categorical.from_codes(
+                detected_codes, categories=pd.Index(detected.values, dtype=object)
+            ),
+        }
+        return pd.DataFrame(cols, columns=list(FRAME_COLUMNS), copy=False)
+
+class CandidateStoreBuilder:
+    """
+    Appends one candidate at a time into compact typed buffers (no per-row objects kept).
+    With `pools_from`, strings are interned into that store's pools so the
+    result can be concatenated with it.
+    """
+    def __init__(self, pools_from: Optional[CandidateStore] = None):
+        self.strings = pools_from.strings if pools_from is not None else StringPool()
+        self.filenames = pools_from.filenames if pools_from is not None else StringPool()
+        self.seq = array("q")
+        self.filename = array("i")
+        self.numeric = {name: array("d") for name in _NUMERIC}
+        self.bias_flagged = array("b")
+        self.matched = _RaggedBuilder()
+        self.missing = _RaggedBuilder()
+        self.snippets = _RaggedBuilder()
+        self.sensitive_labels = _RaggedBuilder()
+        self.sensitive_hits = _RaggedBuilder()
+
+    def append(
+        self,
+        seq: int,
+        filename: str,
+        score: float,
+        score_embed: float,
+        score_skill: float,
+        score_exp: float,
+        years_exp_guess: float,
+        bias_score_delta: float,
+        bias_flagged: bool,
+        matched_skills: List[str],
+        missing_skills: List[str],
+        evidence_snippets: List[str],
+        bias_sensitive_found: Dict[str, List[str]],
+    ) -> None:
+        code = self.strings.code
+        self.seq.append(seq)
+        self.filename.append(self.filenames.code(filename))
+        for name, value in (
+            ("score", score),
+            ("score_embed", score_embed),
+            ("score_skill", score_skill),
+            ("score_exp", score_exp),
+            ("years_exp_guess", years_exp_guess),
+            ("bias_score_delta", bias_score_delta),
+        ):
+            self.numeric[name].append(value)
+        self.bias_flagged.append(bool(bias_flagged))
+        self.matched.append(code(s) for s in matched_skills)
+        self.missing.append(code(s) for s in missing_skills)
+        self.snippets.append(code(s) for s in evidence_snippets)
+        pairs = [(label, hit) for label, hits in bias_sensitive_found.items() for hit in hits]
+        self.sensitive_labels.append(code(label) for label, _ in pairs)
+        self.sensitive_hits.append(code(hit) for _, hit in pairs)
+
+    def build(self) -> CandidateStore:
+        return CandidateStore(
+            strings=self.strings,
+            filenames=self.filenames,
+            seq=_frombuffer(self.seq, np.int64),
+            filename=_frombuffer(self.filename, np.int32),
+            numeric={name: _frombuffer(buf, np.float64) for name, buf in self.numeric.items()},
+            bias_flagged=_frombuffer(self.bias_flagged, np.int8).view(bool),
+            matched=self.matched.build(),
+            missing=self.missing.build(),
+            snippets=self.snippets.build(),
+            sensitive_labels=self.sensitive_labels.build(),
+            sensitive_hits=self.sensitive_hits.build(),
+        )
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .config import Settings
+
+def unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row in place (all-zero rows stay zero, like sklearn).
+    """
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+def stack_vectors(vectors: Sequence[Sequence[float]], dtype=np.float32) -> np.ndarray:
+    """
+    Stack embedding vectors into one (n, dim) matrix of unit rows.
+    """
+    return unit_rows(np.asarray(vectors, dtype=dtype))
+
+def cosine_to_query(query: Sequence[float], unit_matrix: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarity of every row of an already-normalized matrix against `query`,
+    as a single matrix-vector product.
+    """
+    q = np.asarray(query, dtype=unit_matrix.dtype)
+    norm = np.linalg.norm(q)
+    if norm == 0:
+        return np.zeros(unit_matrix.shape[0], dtype=np.float64)
+    return (unit_matrix @ (q / norm)).astype(np.float64)
+
+def hybrid_scores(
+    sim: np.ndarray,
+    sim_masked: np.ndarray,
+    s_skill: np.ndarray,
+    s_exp: np.ndarray,
+    settings: Settings,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted score for original + masked text, and the bias delta (orig - masked).
+    """
+    score = settings.w_embed * sim + settings.w_skill * s_skill + settings.w_exp * s_exp
+    score_masked = settings.w_embed * sim_masked + settings.w_skill * s_skill + settings.w_exp * s_exp
+    return score, score - score_masked
+
+def pool_similarities(jd_vec: Sequence[float], resume_vecs: List[Sequence[float]], masked_vecs: List[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    JD similarity for every resume, original and masked, from one stacked float32 matrix.
+    """
+    n = len(resume_vecs)
+    if n == 0:
+        return np.zeros(0), np.zeros(0)
+    sims = cosine_to_query(jd_vec, stack_vectors(list(resume_vecs) + list(masked_vecs)))
+    return sims[:n], sims[n:]
+
+def pool_similarity_matrix(
+    jd_vecs: List[Sequence[float]], resume_vecs: List[Sequence[float]], masked_vecs: List[Sequence[float]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (n_jds, n_resumes) cosine matrices, original and masked, from one matrix-matrix product.
+    """
+    n = len(resume_vecs)
+    if n == 0 or not jd_vecs:
+        return np.zeros((len(jd_vecs), n)), np.zeros((len(jd_vecs), n))
+    sims = (stack_vectors(jd_vecs) @ stack_vectors(list(resume_vecs) + list(masked_vecs)).T).astype(np.float64)
+    return sims[:, :n], sims[:, n:]
+
+@dataclass
+class ComponentScores:
+    """
+    Columnar per-candidate score components (row i = candidate i). Everything
+    weight-dependent (score, bias delta, flag) can be recomputed from these
+    without re-parsing or re-embedding.
+    """
+    sim: np.ndarray         # JD similarity, original text
+    sim_masked: np.ndarray  # JD similarity, sensitive info masked
+    skill: np.ndarray       # skill overlap
+    exp: np.ndarray         # experience heuristic
+
+    def __len__(self) -> int:
+        return len(self.sim)
+
+    def combine(self, settings: Settings) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score, bias delta and bias flag for every row under `settings`' weights / threshold.
+        """
+        score, delta = hybrid_scores(self.sim, self.sim_masked, self.skill, self.exp, settings)
+        return score, delta, np.abs(delta) >= settings.bias_delta_flag
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+class SkillVocab:
+    """
+    Skill term -> integer column id for one ranking call. Only JD skills are
+    added (ids()); resume skills are looked up (lookup()) and terms outside
+    the vocabulary are dropped, since they can't match anything. Columns, and
+    memory, are bounded by the JD skill lists instead of every term ever seen.
+    """
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def ids(self, terms: Iterable[str]) -> List[int]:
+        """
+        Unique ids for `terms` (lowercased) in first-seen order; new terms are added.
+        """
+        out: Dict[int, None] = {}
+        for t in terms:
+            t = t.lower()
+            i = self._ids.get(t)
+            if i is None:
+                i = len(self.terms)
+                self._ids[t] = i
+                self.terms.append(t)
+            out[i] = None
+        return list(out)
+
+    def lookup(self, terms: Iterable[str]) -> List[int]:
+        """
+        Unique ids of the known `terms` (lowercased) in first-seen order; unknown terms are skipped.
+        """
+        get = self._ids.get
+        return list(dict.fromkeys(i for i in (get(t.lower()) for t in terms) if i is not None))
+
+@dataclass
+class JDSkillVector:
+    """
+    A JD's skill set: sorted unique lowercase names and their ids in the call's vocab, same order.
+    """
+    names: List[str]
+    cols: np.ndarray
+
+def jd_skill_vector(skills: Sequence[str], vocab: SkillVocab) -> JDSkillVector:
+    names = sorted({s.lower() for s in skills})
+    return JDSkillVector(names=names, cols=np.asarray(vocab.ids(names), dtype=np.int64))
+
+def skill_matrix(rows: Sequence[Sequence[int]], n_cols: int) -> sparse.csr_matrix:
+    """
+    Binary (n_rows, n_cols) CSR matrix with a 1 at every id of every row.
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(r) for r in rows])
+    indices = np.fromiter((i for r in rows for i in r), dtype=np.int64, count=int(indptr[-1]))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), n_cols))
+
+def skill_overlap(matrix: sparse.csr_matrix, jd: JDSkillVector) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    """
+    Skill score (matched / JD skills) for every row from one sparse
+    matrix-vector product, plus the (n_rows, n_jd_skills) hit matrix whose
+    columns follow jd.names. Rows that miss a JD skill have no entry there.
+    """
+    n = matrix.shape[0]
+    if not jd.names:
+        return np.zeros(n, dtype=np.float64), sparse.csr_matrix((n, 0), dtype=np.float32)
+    q = np.zeros(matrix.shape[1], dtype=np.float32)
+    q[jd.cols] = 1.0
+    counts = np.asarray(matrix @ q, dtype=np.float64).ravel()
+    return counts / len(jd.names), matrix[:, jd.cols].tocsr()
+
+def hit_columns(hits: sparse.csr_matrix, row: int) -> np.ndarray:
+    """
+    Sorted JD-skill columns matched by one row (a view into the CSR arrays when already sorted).
+    """
+    cols = hits.indices[hits.indptr[row]:hits.indptr[row + 1]]
+    return cols if hits.has_sorted_indices else np.sort(cols)
+
+def matched_missing(jd: JDSkillVector, cols: np.ndarray) -> Tuple[List[str], List[str]]:
+    """
+    Matched and missing skill names (both sorted) for one row's hit columns.
+    """
+    hit = set(cols.tolist())
+    matched = [name for j, name in enumerate(jd.names) if j in hit]
+    missing = [name for j, name in enumerate(jd.names) if j not in hit]
+    return matched, missing
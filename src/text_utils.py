@@ -1,5 +1,9 @@
 import re
-from typing import Dict, List, Tuple
+from functools import cached_property
+from typing import Dict, List, Tuple, Union
+
+from . import metrics
+from .evidence import LineIndex
 
 SECTION_HEADERS = [
     "summary",
@@ -59,25 +63,49 @@ COMMON_SKILLS = {
     "aws", "gcp", "azure",
 }
 
+# Hard-skill keywords that rescue a phrase that also contains filler
+HARD_SKILL_KEYWORDS = ("sql", "python", "excel", "tableau", "power bi", "looker")
+
+# Compiled once at import: normalize / tokenize_skills run several times per resume
+_SPACES_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_PART_SPLIT_RE = re.compile(r"[,\|;/]+")
+_BULLET_RE = re.compile(r"^[\-\*\u2022•\d\.\)\( ]+")
+_WS_RE = re.compile(r"\s+")
+_FILLER_RE = re.compile("|".join(FILLER_PATTERNS))  # one search instead of one per pattern
+_COMMON_SKILLS = tuple(COMMON_SKILLS)
+_HEADER_CHARS_RE = re.compile(r"[^a-z ]")
+_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*\+?\s*years")
+
 def normalize(text: str) -> str:
     text = text or ""
     text = text.replace("\x00", " ")
-    text = re.sub(r"[ \t]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _SPACES_RE.sub(" ", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
     return text.strip()
 
-def extract_sections(text: str) -> Dict[str, str]:
+def section_header(line: str) -> str:
+    """
+    Canonical header name if `line` is a section header line, else "".
+    """
+    low = _HEADER_CHARS_RE.sub("", line.lower()).strip()
+    return low if low in SECTION_HEADERS else ""
+
+def extract_sections(text: Union[str, "ResumeDocument"]) -> Dict[str, str]:
     """
     Lightweight section splitter based on common headers.
     Returns dict with 'full' always present.
     """
+    if isinstance(text, ResumeDocument):
+        return text.sections
     t = normalize(text)
-    lines = [ln.strip() for ln in t.splitlines()]
+    return _sections(t, [ln.strip() for ln in t.splitlines()])
 
+def _sections(t: str, lines: List[str]) -> Dict[str, str]:
     header_idxs: List[Tuple[int, str]] = []
     for i, ln in enumerate(lines):
-        low = re.sub(r"[^a-z ]", "", ln.lower()).strip()
-        if low in SECTION_HEADERS:
+        low = section_header(ln)
+        if low:
             header_idxs.append((i, low))
 
     sections: Dict[str, str] = {"full": t}
@@ -131,11 +159,11 @@ def extract_jd_relevant_block(jd_text: str) -> str:
 
 def _clean_token(token: str) -> str:
     token = token.strip()
-    token = re.sub(r"^[\-\*\u2022•\d\.\)\( ]+", "", token)  # remove bullets/numbering
-    token = re.sub(r"\s+", " ", token)
+    token = _BULLET_RE.sub("", token)  # remove bullets/numbering
+    token = _WS_RE.sub(" ", token)
     return token.strip()
 
-def tokenize_skills(text: str) -> List[str]:
+def tokenize_skills(text: Union[str, "ResumeDocument"]) -> List[str]:
     """
     Improved skill extraction:
     - Pull bullet items / comma-separated phrases
@@ -143,16 +171,22 @@ def tokenize_skills(text: str) -> List[str]:
     - Filter filler phrases
     - Add COMMON_SKILLS detection
     """
-    t = normalize(text).lower()
+    with metrics.span("tokenize_skills"):
+        if isinstance(text, ResumeDocument):
+            metrics.count("tokenize_chars", len(text.lower))
+            return _tokenize(text.lower, text.lower_lines)
+        t = normalize(text).lower()
+        metrics.count("tokenize_chars", len(t))
 
-    # Break into lines first (good for bullet lists)
-    lines = [ln.strip() for ln in t.splitlines() if ln.strip()]
+        # Break into lines first (good for bullet lists)
+        return _tokenize(t, [ln.strip() for ln in t.splitlines() if ln.strip()])
 
+def _tokenize(t: str, lines: List[str]) -> List[str]:
     candidates: List[str] = []
 
     for ln in lines:
         # Split common bullet list separators
-        parts = re.split(r"[,\|;/]+", ln)
+        parts = _PART_SPLIT_RE.split(ln)
         for p in parts:
             p = _clean_token(p)
             if not p:
@@ -163,17 +197,16 @@ def tokenize_skills(text: str) -> List[str]:
             candidates.append(p)
 
     # Also detect common skills anywhere in the block
-    for sk in COMMON_SKILLS:
-        if sk in t:
-            candidates.append(sk)
+    # (plain substring checks: CPython's vectorized `in` beats a combined regex here)
+    candidates.extend(sk for sk in _COMMON_SKILLS if sk in t)
 
     # Filter filler/soft skills phrases
     filtered = []
     for c in candidates:
-        if any(re.search(fp, c) for fp in FILLER_PATTERNS):
+        if _FILLER_RE.search(c):
             # if it's purely filler, skip
             # BUT allow if it contains a hard skill keyword (sql/python/etc.)
-            if not any(h in c for h in ["sql", "python", "excel", "tableau", "power bi", "looker"]):
+            if not any(h in c for h in HARD_SKILL_KEYWORDS):
                 continue
         # keep reasonable length
         if 1 < len(c) <= 40:
@@ -191,13 +224,13 @@ def tokenize_skills(text: str) -> List[str]:
 
     return out
 
-def find_years_experience(text: str) -> float:
+def find_years_experience(text: Union[str, "ResumeDocument"]) -> float:
     """
     Heuristic: find patterns like '3 years', '2+ years'
     Return max found.
     """
-    t = normalize(text).lower()
-    matches = re.findall(r"(\d+(?:\.\d+)?)\s*\+?\s*years", t)
+    t = text.lower if isinstance(text, ResumeDocument) else normalize(text).lower()
+    matches = _YEARS_RE.findall(t)
     vals: List[float] = []
     for m in matches:
         try:
@@ -205,3 +238,55 @@ def find_years_experience(text: str) -> float:
         except ValueError:
             pass
     return max(vals) if vals else 0.0
+
+class ResumeDocument:
+    """
+    One resume, preprocessed once. Normalized text, lowercase text, lines,
+    sections, skills, years of experience, bias scan and evidence index are
+    computed on first use and then reused by every scoring / bias function
+    (they all accept a ResumeDocument in place of a string).
+    """
+    def __init__(self, text: str, filename: str = ""):
+        self.raw = text or ""
+        self.filename = filename
+
+    @cached_property
+    def normalized(self) -> str:
+        return normalize(self.raw)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.normalized.lower()
+
+    @cached_property
+    def lines(self) -> List[str]:
+        # stripped lines, blanks included (section boundaries)
+        return [ln.strip() for ln in self.normalized.splitlines()]
+
+    @cached_property
+    def lower_lines(self) -> List[str]:
+        return [ln.strip() for ln in self.lower.splitlines() if ln.strip()]
+
+    @cached_property
+    def sections(self) -> Dict[str, str]:
+        return _sections(self.normalized, self.lines)
+
+    @cached_property
+    def skills(self) -> List[str]:
+        """
+        Resume skills as the ranker uses them: the skills section if present, else the full text.
+        """
+        return tokenize_skills(self.sections.get("skills", "") or self)
+
+    @cached_property
+    def years_experience(self) -> float:
+        return find_years_experience(self)
+
+    @cached_property
+    def bias_scan(self):
+        from .bias_utils import scan_and_mask_sensitive  # bias_utils imports this module
+        return scan_and_mask_sensitive(self.normalized)
+
+    @cached_property
+    def line_index(self) -> LineIndex:
+        return LineIndex(self.normalized)
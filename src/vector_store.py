@@ -0,0 +1,227 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from .scoring import unit_rows
+
+# Rows scored per block (bounds the float32 temporaries of a scan)
+SCAN_BLOCK_ROWS = 65_536
+
+QUANT_DTYPES = {"int8": np.int8, "float16": np.float16}
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantized rows plus a per-row float32 scale such that scale * row is the
+    unit-length version of the stored direction (so a dot product with a unit
+    query is the cosine).
+    """
+    v = unit_rows(np.asarray(vectors, dtype=np.float32).copy())
+    if dtype == "int8":
+        peak = np.abs(v).max(axis=1, keepdims=True)
+        peak[peak == 0] = 1.0
+        q = np.rint(v / peak * 127).astype(np.int8)
+    elif dtype == "float16":
+        q = v.astype(np.float16)
+    else:
+        raise ValueError(f"Unsupported quantization dtype: {dtype}. Supported: {sorted(QUANT_DTYPES)}")
+    norms = np.linalg.norm(q.astype(np.float32), axis=1)
+    scales = np.where(norms > 0, 1.0 / np.maximum(norms, 1e-12), 0.0).astype(np.float32)
+    return q, scales
+
+class QuantizedVectorStore:
+    """
+    Embedding store on disk: int8 or float16 rows with a per-row float32
+    scale in memory-mapped .npy files, plus an id -> row index (index.json).
+    Rows are appended (capacity doubles as needed) and scored in place;
+    flush() persists the index, so bulk loads write it once, not per add().
+
+    Files in `path`: vectors.npy, scales.npy, index.json.
+    """
+    def __init__(self, path: str, dim: int, dtype: str = "int8", initial_capacity: int = 1024):
+        if dtype not in QUANT_DTYPES:
+            raise ValueError(f"Unsupported quantization dtype: {dtype}. Supported: {sorted(QUANT_DTYPES)}")
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        index_path = os.path.join(path, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["dim"] != dim or meta["dtype"] != dtype:
+                raise ValueError(
+                    f"Store at {path} holds dim={meta['dim']} {meta['dtype']} vectors, not dim={dim} {dtype}"
+                )
+            self.ids: List[str] = meta["ids"]
+            self._vecs = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r+")
+            self._scales = np.load(os.path.join(path, "scales.npy"), mmap_mode="r+")
+        else:
+            self.ids = []
+            self._vecs = open_memmap(
+                os.path.join(path, "vectors.npy"), mode="w+", dtype=QUANT_DTYPES[dtype], shape=(initial_capacity, dim)
+            )
+            self._scales = open_memmap(
+                os.path.join(path, "scales.npy"), mode="w+", dtype=np.float32, shape=(initial_capacity,)
+            )
+        self.dim = dim
+        self.dtype = dtype
+        self._rows: Dict[str, int] = {vid: i for i, vid in enumerate(self.ids)}
+        self._dirty = not os.path.exists(index_path)
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, vid: str) -> bool:
+        return vid in self._rows
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.dim * self._vecs.dtype.itemsize + self._scales.dtype.itemsize
+
+    def rows(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Row numbers for `ids` (KeyError for unknown ids).
+        """
+        return np.fromiter((self._rows[vid] for vid in ids), dtype=np.int64, count=len(ids))
+
+    def _grow(self, need: int) -> None:
+        cap = self._vecs.shape[0]
+        if need <= cap:
+            return
+        new_cap = max(need, cap * 2)
+        for name, arr in (("vectors.npy", self._vecs), ("scales.npy", self._scales)):
+            tmp = os.path.join(self.path, name + ".tmp")
+            grown = open_memmap(tmp, mode="w+", dtype=arr.dtype, shape=(new_cap,) + arr.shape[1:])
+            grown[: len(self.ids)] = arr[: len(self.ids)]
+            grown.flush()
+            del grown
+            arr.flush()
+            os.replace(tmp, os.path.join(self.path, name))
+        self._vecs = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r+")
+        self._scales = np.load(os.path.join(self.path, "scales.npy"), mmap_mode="r+")
+
+    def add(self, ids: Sequence[str], vectors) -> None:
+        """
+        Quantize and store vectors; an id already present is overwritten in place.
+        New ids are only on disk after the next flush().
+        """
+        if not len(ids):
+            return
+        q, scales = quantize(vectors, self.dtype)
+        with self._lock:
+            new = [vid for vid in dict.fromkeys(ids) if vid not in self._rows]
+            self._grow(len(self.ids) + len(new))
+            for vid in new:
+                self._rows[vid] = len(self.ids)
+                self.ids.append(vid)
+            rows = self.rows(ids)
+            self._vecs[rows] = q
+            self._scales[rows] = scales
+            self._dirty = True
+
+    def get(self, ids: Sequence[str]) -> np.ndarray:
+        """
+        Dequantized (unit-length) float32 vectors for `ids`.
+        """
+        rows = self.rows(ids)
+        return self._vecs[rows].astype(np.float32) * self._scales[rows, None]
+
+    def similarities(self, queries, ids: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        (n_queries, n_rows) cosine of each query against the stored rows (all
+        rows, or `ids` in that order), computed block by block on the mapped arrays.
+        """
+        q = unit_rows(np.atleast_2d(np.asarray(queries, dtype=np.float32)).copy())
+        rows = None if ids is None else self.rows(ids)
+        n = len(self.ids) if rows is None else len(rows)
+        out = np.empty((q.shape[0], n), dtype=np.float64)
+        for start in range(0, n, SCAN_BLOCK_ROWS):
+            end = min(start + SCAN_BLOCK_ROWS, n)
+            sel = slice(start, end) if rows is None else rows[start:end]
+            block = self._vecs[sel].astype(np.float32)
+            out[:, start:end] = (q @ block.T) * self._scales[sel]
+        return out
+
+    def top_k(self, query, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Best `k` (id, cosine) pairs for one query over the whole store.
+        """
+        sims = self.similarities(query)[0]
+        k = min(k, len(sims))
+        if k == 0:
+            return []
+        best = np.argpartition(-sims, k - 1)[:k]
+        best = best[np.argsort(-sims[best], kind="stable")]
+        return [(self.ids[i], float(sims[i])) for i in best.tolist()]
+
+    def flush(self) -> None:
+        """
+        Write the mapped arrays and, if ids were added since the last flush, index.json.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._vecs.flush()
+            self._scales.flush()
+            tmp = os.path.join(self.path, "index.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "dtype": self.dtype, "ids": self.ids}, f)
+            os.replace(tmp, os.path.join(self.path, "index.json"))
+            self._dirty = False
+
+def quantization_report(
+    full_vectors, store: QuantizedVectorStore, ids: Sequence[str], queries, k: int = 10
+) -> Dict[str, Any]:
+    """
+    Accuracy cost of `store` against the full-precision `full_vectors`
+    (rows matching `ids`): recall@k of each query's top-k and the absolute
+    cosine error over every (query, vector) pair.
+    """
+    exact = unit_rows(np.atleast_2d(np.asarray(queries, dtype=np.float64)).copy()) @ unit_rows(
+        np.asarray(full_vectors, dtype=np.float64).copy()
+    ).T
+    approx = store.similarities(queries, ids)
+    k = min(k, exact.shape[1])
+
+    recalls = []
+    for e, a in zip(exact, approx):
+        top_e = set(np.argpartition(-e, k - 1)[:k].tolist())
+        top_a = set(np.argpartition(-a, k - 1)[:k].tolist())
+        recalls.append(len(top_e & top_a) / k)
+    err = np.abs(exact - approx)
+    return {
+        "dtype": store.dtype,
+        "vectors": int(exact.shape[1]),
+        "queries": int(exact.shape[0]),
+        "dim": store.dim,
+        "k": k,
+        f"recall_at_{k}_mean": round(float(np.mean(recalls)), 4),
+        f"recall_at_{k}_min": round(float(np.min(recalls)), 4),
+        "score_abs_err_mean": float(err.mean()),
+        "score_abs_err_p99": float(np.percentile(err, 99)),
+        "score_abs_err_max": float(err.max()),
+        "bytes_per_vector": store.bytes_per_vector,
+        "compression_vs_float64": round(store.dim * 8 / store.bytes_per_vector, 2),
+    }
+
+_STORES: Dict[str, QuantizedVectorStore] = {}
+
+def get_vector_store(settings, dim: int) -> Optional[QuantizedVectorStore]:
+    """
+    Process-wide store per (directory, model, dtype). Returns None when
+    Settings.vector_store_dir is empty (vectors stay in memory).
+    """
+    if not settings.vector_store_dir:
+        return None
+    model = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in settings.embedding_model)
+    path = os.path.join(settings.vector_store_dir, f"{model}-{settings.vector_store_dtype}")
+    store = _STORES.get(path)
+    if store is None:
+        store = QuantizedVectorStore(path, dim=dim, dtype=settings.vector_store_dtype)
+        _STORES[path] = store
+    return store
@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import types
+
+from src.io_utils import _worker_pool, load_resume_files
+
+def _streamlit_main(tmp_path, monkeypatch):
+    # Streamlit swaps in a __main__ whose __file__ is the app script, and the
+    # script can't run outside a session; spawn workers must not import it.
+    script = tmp_path / "app.py"
+    script.write_text("raise AttributeError('st.session_state has no attribute \"jd_text\"')\n")
+    fake_main = types.ModuleType("__main__")
+    fake_main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", fake_main)
+    return script
+
+def test_pool_workers_skip_streamlit_main(tmp_path, monkeypatch):
+    script = _streamlit_main(tmp_path, monkeypatch)
+
+    sources = [f"resume {i}: python, sql".encode("utf-8") for i in range(4)]
+    names = [f"r{i}.txt" for i in range(4)]
+    start = time.perf_counter()
+    parsed = load_resume_files(sources, names, max_workers=2, timeout_s=20, min_pool_size=4)
+
+    assert [p.error for p in parsed] == [""] * 4
+    assert [p.text for p in parsed] == [s.decode("utf-8") for s in sources]
+    assert time.perf_counter() - start < 20
+    assert sys.modules["__main__"].__file__ == str(script)
+
+def test_replacement_workers_skip_streamlit_main(tmp_path, monkeypatch):
+    # Pool restarts dead workers from its handler thread, after the pool was built
+    script = _streamlit_main(tmp_path, monkeypatch)
+    pool = _worker_pool(1)
+    try:
+        first = pool.apply_async(os.getpid).get(timeout=20)
+        pool.apply_async(os._exit, (1,))  # the worker dies mid-task
+        replacement = pool.apply_async(os.getpid).get(timeout=20)
+        assert replacement != first
+    finally:
+        pool.terminate()
+        pool.join()
+    assert sys.modules["__main__"].__file__ == str(script)
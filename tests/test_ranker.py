@@ -0,0 +1,41 @@
+import pytest
+
+from src.config import Settings
+from src.ranker import RankingSession, rank_candidates_columnar, rank_matrix, rank_top_k
+
+SETTINGS = Settings(embedding_model="local-hashing-64", use_embedding_cache=False)
+RESUMES = [("a.txt", "Skills: sql, python"), ("b.txt", "Skills: tableau")]
+
+@pytest.mark.parametrize("kwargs", [{"top_k": 0}, {"chunk_size": 0}, {"chunk_size": -1}])
+def test_rank_top_k_rejects_bad_sizes(kwargs):
+    with pytest.raises(ValueError):
+        rank_top_k("Requirements: sql, python", RESUMES, SETTINGS, **kwargs)
+
+def test_rank_top_k_keeps_every_resume_with_chunk_size_one():
+    results = rank_top_k("Requirements: sql, python", RESUMES, SETTINGS, top_k=5, chunk_size=1)
+    assert sorted(r.filename for r in results) == ["a.txt", "b.txt"]
+
+def test_rank_candidates_columnar_rejects_bad_chunk_size():
+    with pytest.raises(ValueError):
+        rank_candidates_columnar("Requirements: sql", RESUMES, SETTINGS, chunk_size=0)
+
+@pytest.mark.parametrize("top_k", [0, -1])
+def test_rank_matrix_rejects_bad_top_k(top_k):
+    with pytest.raises(ValueError):
+        rank_matrix(["Requirements: sql"], RESUMES, SETTINGS, top_k=top_k)
+
+def test_rank_matrix_top_k_none_keeps_every_resume():
+    m = rank_matrix(["Requirements: sql"], RESUMES, SETTINGS, top_k=None)
+    assert len(m.rankings[0]) == len(RESUMES)
+
+def test_ranking_session_pools_stay_bounded_under_churn():
+    session = RankingSession("Requirements: sql, python, tableau", SETTINGS)
+    for i in range(40):
+        session.sync([(f"r{i}.txt", f"Skills: sql, python\nBuilt report {i} in tableau")])
+    store = session.ranking.by_row
+    assert len(store.filenames) == 1
+    assert len(store.strings) <= 12  # one resume's skills + snippets, at most half dead
+    [row] = session.results
+    assert (row.candidate_id, row.filename) == ("C040", "r39.txt")
+    assert row.matched_skills == ["python", "sql", "tableau"]
+    assert "Built report 39 in tableau" in row.evidence_snippets